@@ -1,80 +1,193 @@
 import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import logging
+import logging.handlers
+import queue
+from pathlib import Path
 
 import discord
 from discord.ext import commands
 
+try:
+    import uvloop
+except ImportError:  # uvloop gibt es nicht unter Windows
+    uvloop = None
+
 from config import config_manager, get_token
-from utils.ffmpeg_helper import ensure_ffmpeg
 from utils.health_monitor import HealthMonitor
-from web.server import maybe_start_management_server, ManagementServer
 
 
-COGS = [
+log = logging.getLogger("primebot")
+
+
+COGS = (
     "admin",
     "tickets",
     "verification",
     "music",
-]
+)
+
+# Hash der zuletzt synchronisierten Slash-Commands
+COMMAND_SIGNATURE_PATH = Path("data/.command_signature")
+
+
+# Intents als Bitmaske: Default + guilds/voice_states, optionale Flags je nach Konfiguration
+_BASE_INTENTS = (
+    discord.Intents.default().value | discord.Intents.guilds.flag | discord.Intents.voice_states.flag
+)
+_OPTIONAL_INTENTS = (
+    ("enable_message_content_intent", True, discord.Intents.message_content.flag),
+    ("enable_members_intent", True, discord.Intents.members.flag),
+    ("enable_presence_intent", False, discord.Intents.presences.flag),
+)
+
+
+# [Präfix, Konfigurationsversion] - wird nur nach Konfigurationsänderungen neu gelesen
+_PREFIX_CACHE: list = [None, -1]
 
 
 def dynamic_prefix(_bot: commands.Bot, _message: discord.Message):
-    return config_manager.get("command_prefix", "!")
+    version = config_manager.version
+    if _PREFIX_CACHE[1] != version:
+        _PREFIX_CACHE[0] = config_manager.get("command_prefix", "!")
+        _PREFIX_CACHE[1] = version
+    return _PREFIX_CACHE[0]
+
+
+def _walk_app_commands(items):
+    """Liefert App-Commands samt verschachtelter Gruppen-Subcommands."""
+    for command in items:
+        yield command
+        yield from _walk_app_commands(getattr(command, "commands", ()))
 
 
 class PrimeBot(commands.Bot):
     def __init__(self) -> None:
         config = config_manager
-        intents = discord.Intents.default()
-        intents.guilds = True
-        intents.voice_states = True
-        if config.get("enable_message_content_intent", True):
-            intents.message_content = True
-        if config.get("enable_members_intent", True):
-            intents.members = True
-        if config.get("enable_presence_intent", False):
-            intents.presences = True
-        super().__init__(command_prefix=dynamic_prefix, intents=intents)
+        mask = _BASE_INTENTS
+        for key, default, flag in _OPTIONAL_INTENTS:
+            if config.get(key, default):
+                mask |= flag
+        super().__init__(command_prefix=dynamic_prefix, intents=discord.Intents(value=mask))
         self.config = config
+        # Guild-ID nur einmal auflösen, Cogs können bot._guild_id wiederverwenden
+        self._guild_id = config.get_int("guild_id")
+        self._guild_obj = discord.Object(id=self._guild_id) if self._guild_id else None
         self.health_monitor = HealthMonitor(self)
 
     async def setup_hook(self) -> None:
-        for extension in COGS:
-            try:
-                await self.load_extension(f"cogs.{extension}")
-            except Exception as exc:
-                print(f"Fehler beim Laden von {extension}: {exc}")
-        guild_id = self.config.get_int("guild_id")
-        if guild_id:
-            guild_obj = discord.Object(id=guild_id)
-            await self.tree.sync(guild=guild_obj)
-            print(f"Slash-Commands ausschließlich für Guild {guild_id} synchronisiert.")
+        # Ab Python 3.12: Tasks laufen sofort an, bis sie das erste Mal warten
+        eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+        if eager_task_factory is not None:
+            asyncio.get_running_loop().set_task_factory(eager_task_factory)
+        results = await asyncio.gather(
+            *(self.load_extension(f"cogs.{extension}") for extension in COGS),
+            return_exceptions=True,
+        )
+        for extension, result in zip(COGS, results):
+            if isinstance(result, BaseException):
+                log.error("Fehler beim Laden von %s: %s", extension, result, exc_info=result)
+        await self._sync_commands()
+        await self.health_monitor.start()
+
+    async def _sync_commands(self) -> None:
+        signature = self._command_signature()
+        try:
+            previous = COMMAND_SIGNATURE_PATH.read_text(encoding="utf-8")
+        except OSError:
+            previous = ""
+        if previous == signature:
+            log.info("Slash-Commands unverändert, Synchronisierung übersprungen.")
+            return
+        if self._guild_obj is not None:
+            await self.tree.sync(guild=self._guild_obj)
+            log.info("Slash-Commands ausschließlich für Guild %s synchronisiert.", self._guild_id)
         else:
             await self.tree.sync()
-            print("Globale Slash-Commands synchronisiert (kann bis zu 1h dauern).")
-        await self.health_monitor.start()
+            log.info("Globale Slash-Commands synchronisiert (kann bis zu 1h dauern).")
+        try:
+            COMMAND_SIGNATURE_PATH.write_text(signature, encoding="utf-8")
+        except OSError as exc:
+            log.warning("Command-Signatur konnte nicht gespeichert werden: %s", exc)
+
+    def _command_signature(self) -> str:
+        payload = {
+            # Anderer Token/andere App: gleiche Commands müssen trotzdem neu synchronisiert werden
+            "application": self.application_id,
+            "guild": self._guild_id,
+            "commands": [
+                command.to_dict(self.tree)
+                for command in _walk_app_commands(self.tree.get_commands(guild=self._guild_obj))
+            ],
+        }
+        raw = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def run_blocking(self, func, *args) -> asyncio.Future:
+        """Führt eine blockierende Funktion im Default-Executor der Bot-Loop aus."""
+        context = contextvars.copy_context()
+        if not context:
+            # Leerer Kontext: ctx.run-Wrapper und partial sparen
+            return self.loop.run_in_executor(None, func, *args)
+        return self.loop.run_in_executor(None, functools.partial(context.run, func, *args))
 
     async def on_ready(self) -> None:
-        print(f"Bot ist online als {self.user} (Guilds: {len(self.guilds)})")
+        log.info("Bot ist online als %s (Guilds: %d)", self.user, len(self.guilds))
 
     async def close(self) -> None:
-        await self.health_monitor.shutdown()
-        await super().close()
+        try:
+            await self.health_monitor.shutdown()
+            await self.config.flush()
+        finally:
+            # Gateway und HTTP-Session auch dann schließen, wenn das Speichern scheitert
+            await super().close()
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Leitet alle Logeinträge über eine Queue an einen eigenen Schreib-Thread."""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)-8s %(name)s: %(message)s", "%Y-%m-%d %H:%M:%S")
+    )
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
 
 
 async def main():
-    ensure_ffmpeg(config_manager)
-    bot = PrimeBot()
+    # Erst hier importieren: FFmpeg-Helper und Webserver werden nur zum Start gebraucht
+    from utils.ffmpeg_helper import ensure_ffmpeg
+    from web.server import maybe_start_management_server, ManagementServer
+
+    listener = setup_logging()
     management: ManagementServer | None = None
+    # Ab hier immer listener.stop(): sonst gehen Einträge in der Queue (auch der fatale) verloren
     try:
-        management = await maybe_start_management_server(bot, config_manager)
-    except Exception as exc:
-        print(f"Management-Webinterface konnte nicht gestartet werden: {exc}")
-    try:
+        ensure_ffmpeg(config_manager)
+        bot = PrimeBot()
+        try:
+            management = await maybe_start_management_server(bot, config_manager)
+        except Exception as exc:
+            log.exception("Management-Webinterface konnte nicht gestartet werden: %s", exc)
         await bot.start(get_token())
     finally:
         if management:
             await management.stop()
+        listener.stop()
+
+
+__all__ = ["PrimeBot", "main"]
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    # Debugmodus nur auf ausdrücklichen Wunsch, auch wenn PYTHONASYNCIODEBUG gesetzt ist
+    asyncio.run(main(), debug=bool(config_manager.get("asyncio_debug", False)))
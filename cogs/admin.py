@@ -1,24 +1,38 @@
-from typing import Literal
+from types import MappingProxyType
+from typing import Any, Callable, Optional
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 
 from config import config_manager, CONFIG_SCHEMA
 
-CHANNEL_CHOICES = {
+CHANNEL_CHOICES = MappingProxyType({
     "ticket": "ticket_channel_id",
     "ticket_panel": "ticket_panel_channel_id",
     "ticket_queue": "ticket_queue_channel_id",
     "verify": "verify_channel_id",
     "music": "music_channel_id",
     "music_log": "music_log_channel_id",
-}
+})
 
-ROLE_CHOICES = {
+ROLE_CHOICES = MappingProxyType({
     "admin": "admin_role_id",
     "verified": "verified_role_id",
     "dj": "dj_role_id",
-}
+})
+
+# Reihenfolge und Art der Schlüssel einmalig beim Import bestimmen
+_SCHEMA_ITEMS = tuple(CONFIG_SCHEMA.items())
+_SCHEMA_KIND = tuple(
+    "channel" if key.endswith("_channel_id") else "role" if key.endswith("_role_id") else "plain"
+    for key, _meta in _SCHEMA_ITEMS
+)
+_SHOW_COLOR = discord.Color.blurple().value
+
+
+def _no_lookup(_target_id: int) -> None:
+    return None
 
 
 class Admin(commands.Cog):
@@ -29,26 +43,22 @@ class Admin(commands.Cog):
     async def cog_check(self, ctx: commands.Context) -> bool:
         return bool(ctx.author.guild_permissions.administrator)
 
-    async def _respond(self, ctx: commands.Context, message: str | None = None, *, embed: discord.Embed | None = None) -> None:
+    @staticmethod
+    async def _respond(ctx: commands.Context, message: str | None = None, *, embed: discord.Embed | None = None) -> None:
         content = message or ""
         if not content and embed is None:
             content = "✔️"
-        if ctx.interaction:
-            if not ctx.interaction.response.is_done():
-                if embed:
-                    await ctx.interaction.response.send_message(content, embed=embed, ephemeral=True)
-                else:
-                    await ctx.interaction.response.send_message(content, ephemeral=True)
-            else:
-                if embed:
-                    await ctx.interaction.followup.send(content, embed=embed, ephemeral=True)
-                else:
-                    await ctx.interaction.followup.send(content, ephemeral=True)
+        interaction = ctx.interaction
+        kwargs = {}
+        if embed is not None:
+            kwargs["embed"] = embed
+        if interaction:
+            kwargs["ephemeral"] = True
+            response = interaction.response
+            send = interaction.followup.send if response.is_done() else response.send_message
         else:
-            if embed:
-                await ctx.reply(content, embed=embed)
-            else:
-                await ctx.reply(content)
+            send = ctx.reply
+        await send(content, **kwargs)
 
     @commands.hybrid_group(name="config", description="Verwalte Bot-Einstellungen")
     @commands.has_permissions(administrator=True)
@@ -58,33 +68,47 @@ class Admin(commands.Cog):
 
     @config_group.command(name="show", description="Aktive Konfiguration anzeigen")
     async def config_show(self, ctx: commands.Context) -> None:
-        embed = discord.Embed(title="Aktive Konfiguration", color=discord.Color.blurple())
         guild = ctx.guild
-        for key, meta in CONFIG_SCHEMA.items():
-            value = self.config.get(key)
-            pretty = self._pretty_value(guild, key, value)
-            embed.add_field(name=key, value=pretty, inline=False)
+        # Lookup-Methoden einmal binden statt pro Zeile über ctx.guild aufzulösen
+        get_channel = guild.get_channel_or_thread if guild else _no_lookup
+        get_role = guild.get_role if guild else _no_lookup
+        get = self.config.get
+        description = "\n".join(
+            f"**{key}**: {self._pretty_value(get_channel, get_role, kind, get(key))}"
+            for (key, _meta), kind in zip(_SCHEMA_ITEMS, _SCHEMA_KIND)
+        )
+        embed = discord.Embed.from_dict(
+            {"title": "Aktive Konfiguration", "description": description, "color": _SHOW_COLOR}
+        )
         await self._respond(ctx, "", embed=embed)
 
     @config_group.command(name="setchannel", description="Setze einen Zielkanal")
+    @app_commands.choices(target=[app_commands.Choice(name=name, value=name) for name in CHANNEL_CHOICES])
     async def config_set_channel(
         self,
         ctx: commands.Context,
-        target: Literal["ticket", "ticket_panel", "ticket_queue", "verify", "music"],
+        target: str,
         channel: discord.TextChannel,
     ) -> None:
-        key = CHANNEL_CHOICES[target]
+        key = CHANNEL_CHOICES.get(target)
+        if key is None:
+            await self._respond(ctx, f"Unbekanntes Ziel: {target} (erlaubt: {', '.join(CHANNEL_CHOICES)})")
+            return
         self.config.set_value(key, channel.id)
         await self._respond(ctx, f"{target} Kanal gesetzt auf {channel.mention}")
 
     @config_group.command(name="setrole", description="Setze eine Rolle")
+    @app_commands.choices(target=[app_commands.Choice(name=name, value=name) for name in ROLE_CHOICES])
     async def config_set_role(
         self,
         ctx: commands.Context,
-        target: Literal["admin", "verified", "dj"],
+        target: str,
         role: discord.Role,
     ) -> None:
-        key = ROLE_CHOICES[target]
+        key = ROLE_CHOICES.get(target)
+        if key is None:
+            await self._respond(ctx, f"Unbekanntes Ziel: {target} (erlaubt: {', '.join(ROLE_CHOICES)})")
+            return
         self.config.set_value(key, role.id)
         await self._respond(ctx, f"{target}-Rolle gesetzt auf {role.mention}")
 
@@ -99,24 +123,32 @@ class Admin(commands.Cog):
 
     @config_group.command(name="reload", description="Konfiguration von Disk laden")
     async def config_reload(self, ctx: commands.Context) -> None:
-        self.config.load()
+        # Ausstehende Änderungen zuerst schreiben; nur das Lesen der Datei läuft im Thread,
+        # Übernahme der Werte und Cache-Reset bleiben auf der Event-Loop
+        await self.config.flush()
+        await self.config.aload()
         await self._respond(ctx, "Konfiguration neu geladen.")
 
     @config_group.command(name="reset", description="Alle Werte auf Default setzen")
     async def config_reset(self, ctx: commands.Context) -> None:
+        # Nur im Speicher, das Schreiben übernimmt der entprellte Save auf der Loop
         self.config.reset()
         await self._respond(ctx, "Konfiguration zurückgesetzt. Bitte setze die Werte neu.")
 
-    def _pretty_value(self, guild: discord.Guild | None, key: str, value) -> str:
+    @staticmethod
+    def _pretty_value(
+        get_channel: Callable[[int], Optional[Any]],
+        get_role: Callable[[int], Optional[discord.Role]],
+        kind: str,
+        value,
+    ) -> str:
         if not value:
             return "(nicht gesetzt)"
-        if key.endswith("_channel_id") and guild:
-            channel = guild.get_channel(int(value))
-            return channel.mention if channel else str(value)
-        if key.endswith("_role_id") and guild:
-            role = guild.get_role(int(value))
-            return role.mention if role else str(value)
-        return str(value)
+        if kind == "plain":
+            return str(value)
+        target_id = int(value)
+        target = (get_channel if kind == "channel" else get_role)(target_id)
+        return target.mention if target else str(target_id)
 
 
 async def setup(bot: commands.Bot) -> None:
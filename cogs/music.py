@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import os
+import shutil
 import time
-from collections import deque
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from functools import partial
-from typing import Dict, List, Optional, Tuple, Literal
+from functools import cached_property, partial, wraps
+from itertools import islice
+from typing import Awaitable, Dict, List, Optional, Tuple, Literal
 
 import discord
 from discord.ext import commands
@@ -14,6 +19,8 @@ from discord.utils import utcnow
 
 from config import config_manager
 
+log = logging.getLogger(__name__)
+
 
 YTDL_OPTS = {
     "format": "bestaudio/best",
@@ -21,27 +28,67 @@ YTDL_OPTS = {
     "default_search": "ytsearch",
     "quiet": True,
     "no_warnings": True,
+    # Nur Metadaten + Stream-URL: alles andere kostet zusätzliche Requests und Parsing
+    "skip_download": True,
+    "youtube_include_dash_manifest": False,
+    "writesubtitles": False,
+    "writeautomaticsub": False,
+    "writethumbnail": False,
+    "getcomments": False,
+    "check_formats": False,
 }
 
 FFMPEG_BEFORE_OPTS = "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5"
+# Sekunden vor Trackende, ab denen FFmpeg für den nächsten Track vorgestartet wird
+PRELOAD_LEAD_SECONDS = 2
+# Takt, in dem die Spielzeit für den Preload gezählt wird (Pausen zählen nicht mit)
+PRELOAD_POLL_SECONDS = 1.0
 
+# YouTube-Stream-URLs laufen nach ca. 6h ab, daher etwas früher verwerfen
+EXTRACT_CACHE_TTL = 5 * 3600
+EXTRACT_CACHE_SIZE = 256
 
-def build_music_panel_embed(dj_role_id: int | None) -> discord.Embed:
-    description = (
+
+# Statischer Teil des Panels, wird pro Aufruf nur kopiert
+_PANEL_TEMPLATE = discord.Embed(
+    title="Musiksteuerung",
+    description=(
         "Steuere hier die Musik des Servers.\n\n"
         "🎧 **Song hinzufügen** – öffnet ein Eingabefenster\n"
         "⏯️ **Pause/Fortsetzen** – kontrolliere die Wiedergabe\n"
         "⏭️ **Überspringen** – springt zum nächsten Track\n"
         "⏹️ **Stoppen** – leert die Queue"
-    )
-    embed = discord.Embed(title="Musiksteuerung", description=description, color=discord.Color.blurple())
+    ),
+    color=discord.Color.blurple(),
+).set_footer(text="Nutze das Panel, statt viele Slash-Befehle zu spammen.")
+
+
+def build_music_panel_embed(dj_role_id: int | None) -> discord.Embed:
+    embed = _PANEL_TEMPLATE.copy()
     if dj_role_id:
         embed.add_field(name="Benötigte Rolle", value=f"<@&{dj_role_id}>", inline=False)
-    embed.set_footer(text="Nutze das Panel, statt viele Slash-Befehle zu spammen.")
     embed.timestamp = utcnow()
     return embed
 
 
+def require_voice_member(label: str):
+    """Gemeinsame Prüfung für Panel-Buttons: Handler erhalten (interaction, guild, member)."""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self: "Music", interaction: discord.Interaction) -> None:
+            guild, member, error = self.validate_interaction_member(interaction)
+            if error:
+                await self.send_interaction_message(interaction, content=error, ephemeral=True)
+                await self.send_debug(guild, f"{label} verweigert: {error}")
+                return
+            await func(self, interaction, guild, member)
+
+        return wrapper
+
+    return decorator
+
+
 @dataclass
 class Track:
     title: str
@@ -51,17 +98,45 @@ class Track:
     requester: discord.Member
 
 
+class TrackQueue(asyncio.Queue):
+    """asyncio.Queue mit Blick auf den Kopf und Einreihen ganz vorne."""
+
+    def put_front(self, track: Track) -> None:
+        self._queue.appendleft(track)
+        self._unfinished_tasks += 1
+        self._finished.clear()
+        self._wakeup_next(self._getters)
+
+    def head(self) -> Optional[Track]:
+        return self._queue[0] if self._queue else None
+
+    def items(self) -> List[Track]:
+        return list(self._queue)
+
+    def peek(self, count: int) -> List[Track]:
+        return list(islice(self._queue, count))
+
+    def clear(self) -> None:
+        while True:
+            try:
+                self.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            self.task_done()
+
+
 class MusicPlayer:
     def __init__(self, bot: commands.Bot, guild_id: int, ffmpeg_path: str) -> None:
         self.bot = bot
         self.guild_id = guild_id
         self.ffmpeg_path = ffmpeg_path
-        self.pending: deque[Track] = deque()
-        self.queue_event = asyncio.Event()
+        self.pending: TrackQueue = TrackQueue()
         self.next = asyncio.Event()
         self.current: Optional[Track] = None
         self.voice: Optional[discord.VoiceClient] = None
         self.volume = 0.5
+        self._preloaded: Optional[Tuple[Track, discord.AudioSource]] = None
+        self._preload_task: Optional[asyncio.Task[None]] = None
         self.monitor = getattr(bot, "health_monitor", None)
         self.loop_task = bot.loop.create_task(self.player_loop())
 
@@ -76,27 +151,32 @@ class MusicPlayer:
         return False
 
     async def add_track(self, track: Track) -> None:
-        self.pending.append(track)
-        self.queue_event.set()
+        self.pending.put_nowait(track)
 
     def clear_queue(self) -> None:
         self.pending.clear()
+        self._discard_preloaded()
 
     def queue_items(self) -> List[Track]:
-        return list(self.pending)
+        return self.pending.items()
+
+    def queue_head(self, count: int) -> List[Track]:
+        return self.pending.peek(count)
 
     def queue_size(self) -> int:
-        return len(self.pending)
+        return self.pending.qsize()
 
     async def player_loop(self) -> None:
         try:
             while True:
                 self.next.clear()
-                wait_started = time.perf_counter()
+                # Telemetrie nur messen, wenn ein HealthMonitor vorhanden ist
+                monitor = self.monitor
+                wait_started = time.perf_counter() if monitor else 0.0
                 track = await self._wait_for_track()
-                wait_duration = (time.perf_counter() - wait_started) * 1000.0
-                if self.monitor:
-                    self.monitor.record_bot_task(
+                if monitor:
+                    wait_duration = (time.perf_counter() - wait_started) * 1000.0
+                    monitor.record_bot_task(
                         "music.queue_wait",
                         wait_duration,
                         {
@@ -106,35 +186,32 @@ class MusicPlayer:
                         },
                     )
                 if not self.voice or not self.voice.is_connected():
-                    self.pending.appendleft(track)
+                    self.pending.put_front(track)
                     await asyncio.sleep(1)
                     continue
 
                 self.current = track
 
-                source = discord.PCMVolumeTransformer(
-                    discord.FFmpegPCMAudio(
-                        track.stream_url,
-                        executable=self.ffmpeg_path,
-                        before_options=FFMPEG_BEFORE_OPTS,
-                        options="-vn",
-                    ),
-                    volume=self.volume,
-                )
+                source = self._take_preloaded(track) or self._create_source(track)
 
                 def after_play(error: Optional[Exception]) -> None:
-                    if error:
-                        print(f"Player error: {error}")
+                    # Läuft im Voice-Thread: erst die Player-Loop wecken, dann loggen
                     self.bot.loop.call_soon_threadsafe(self.next.set)
+                    if error:
+                        log.error("Player error: %s", error)
 
-                play_started = time.perf_counter()
+                play_started = time.perf_counter() if monitor else 0.0
                 self.voice.play(source, after=after_play)
+                if track.duration:
+                    self._preload_task = asyncio.create_task(self._preload_next(track.duration))
                 await self.next.wait()
-                play_duration = (time.perf_counter() - play_started) * 1000.0
-                if self.monitor:
-                    self.monitor.record_bot_task(
+                if self._preload_task is not None:
+                    self._preload_task.cancel()
+                    self._preload_task = None
+                if monitor:
+                    monitor.record_bot_task(
                         "music.track_play",
-                        play_duration,
+                        (time.perf_counter() - play_started) * 1000.0,
                         {
                             "guild_id": self.guild_id,
                             "title": track.title,
@@ -150,12 +227,52 @@ class MusicPlayer:
         except asyncio.CancelledError:
             pass
 
+    def _create_source(self, track: Track) -> discord.AudioSource:
+        # Lautstärke regelt FFmpeg, das direkt Opus liefert (kein PCM-Umweg in Python)
+        return discord.FFmpegOpusAudio(
+            track.stream_url,
+            executable=self.ffmpeg_path,
+            before_options=FFMPEG_BEFORE_OPTS,
+            options=f"-vn -filter:a volume={self.volume}",
+        )
+
+    async def _preload_next(self, duration: int) -> None:
+        remaining = duration - PRELOAD_LEAD_SECONDS
+        while remaining > 0:
+            step = min(remaining, PRELOAD_POLL_SECONDS)
+            await asyncio.sleep(step)
+            voice = self.voice
+            if voice is not None and voice.is_playing():
+                remaining -= step
+        track = self.pending.head()
+        if self._preloaded is not None or track is None:
+            return
+        # FFmpeg startet sofort und füllt seinen Pipe-Puffer, bevor der Track dran ist
+        self._preloaded = (track, self._create_source(track))
+
+    def _take_preloaded(self, track: Track) -> Optional[discord.AudioSource]:
+        preloaded = self._preloaded
+        if preloaded is None:
+            return None
+        if preloaded[0] is track:
+            self._preloaded = None
+            return preloaded[1]
+        self._discard_preloaded()
+        return None
+
+    def _discard_preloaded(self) -> None:
+        preloaded, self._preloaded = self._preloaded, None
+        if preloaded is None:
+            return
+        try:
+            preloaded[1].cleanup()
+        except (ValueError, OSError):
+            pass
+
     async def _wait_for_track(self) -> Track:
-        while True:
-            if self.pending:
-                return self.pending.popleft()
-            self.queue_event.clear()
-            await self.queue_event.wait()
+        track = await self.pending.get()
+        self.pending.task_done()
+        return track
 
 
 class Music(commands.Cog):
@@ -163,31 +280,52 @@ class Music(commands.Cog):
         self.bot = bot
         self.config = config_manager
         self.players: Dict[int, MusicPlayer] = {}
-        self.ytdl = yt_dlp.YoutubeDL(YTDL_OPTS)
         self.debug_enabled: Dict[int, bool] = {}
+        self._extract_cache: OrderedDict[str, Tuple[float, dict]] = OrderedDict()
+        self._extract_locks: Dict[str, asyncio.Lock] = {}
+        # Eigener, begrenzter Pool: yt-dlp blockiert so nicht den Default-Executor
+        self._ytdl_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ytdl")
+        self._ffmpeg_path = ""
+        self._ffmpeg_version = -1
+        # Eine persistente View für alle Panels (Zuordnung erfolgt über custom_id)
+        self._panel_view = MusicPanelView(self)
+
+    @cached_property
+    def ytdl(self) -> yt_dlp.YoutubeDL:
+        # Erst bei der ersten Suche anlegen, das hält das Laden des Cogs schlank
+        return yt_dlp.YoutubeDL(YTDL_OPTS)
+
+    def _ffmpeg_executable(self) -> str:
+        # Absoluter, aufgelöster Pfad: Popen muss dann nicht mehr PATH durchsuchen
+        version = self.config.version
+        if version != self._ffmpeg_version:
+            configured = self.config.get_str("ffmpeg_path") or "ffmpeg"
+            resolved = shutil.which(configured)
+            self._ffmpeg_path = os.path.realpath(resolved) if resolved else configured
+            self._ffmpeg_version = version
+        return self._ffmpeg_path
 
     def dj_allowed(self, member: discord.Member) -> bool:
         dj_role_id = self.config.get_int("dj_role_id")
-        return dj_role_id == 0 or any(role.id == dj_role_id for role in member.roles)
+        return dj_role_id == 0 or member.get_role(dj_role_id) is not None
 
     def check_music_channel(
         self,
         guild: Optional[discord.Guild],
         channel_id: Optional[int],
         *,
-        channel_obj: Optional[discord.abc.GuildChannel] = None,
+        channel_obj: Optional[discord.abc.Messageable] = None,
     ) -> Tuple[bool, Optional[str]]:
         allowed_id = self.config.get_int("music_channel_id")
-        if not allowed_id:
-            return True, None
-        if channel_id == allowed_id:
+        # Häufigster Fall: kein Musikkanal gesetzt oder direkt im Musikkanal
+        if not allowed_id or channel_id == allowed_id:
             return True, None
         if channel_obj is None and guild and channel_id:
-            resolved = guild.get_channel(channel_id)
-            if isinstance(resolved, discord.abc.GuildChannel):
-                channel_obj = resolved
-        parent_id = None
-        if channel_obj is not None:
+            # get_channel liefert ohnehin nur GuildChannel oder None
+            channel_obj = guild.get_channel(channel_id)
+        if isinstance(channel_obj, discord.Thread):
+            parent_id = channel_obj.parent_id
+        else:
             parent_id = getattr(channel_obj, "parent_id", None)
         if parent_id == allowed_id:
             return True, None
@@ -200,8 +338,9 @@ class Music(commands.Cog):
 
     async def ensure_music_channel_ctx(self, ctx: commands.Context) -> bool:
         guild = ctx.guild
-        channel = ctx.channel if isinstance(ctx.channel, discord.abc.GuildChannel) else None
-        channel_id = getattr(ctx.channel, "id", None)
+        # Kein Typ-Check nötig: check_music_channel liest parent_id nur bei Bedarf
+        channel = ctx.channel
+        channel_id = getattr(channel, "id", None)
         allowed, message = self.check_music_channel(guild, channel_id, channel_obj=channel)
         if not allowed and message:
             await self.send_ctx_message(ctx, content=message, ephemeral=True)
@@ -211,7 +350,10 @@ class Music(commands.Cog):
         return True
 
     async def cog_load(self) -> None:
-        self.bot.add_view(MusicPanelView(self))
+        self.bot.add_view(self._panel_view)
+
+    async def cog_unload(self) -> None:
+        self._ytdl_executor.shutdown(wait=False, cancel_futures=True)
 
     async def send_ctx_message(
         self,
@@ -254,9 +396,8 @@ class Music(commands.Cog):
             await interaction.response.send_message(**kwargs)
 
     async def send_debug(self, guild: discord.Guild | None, message: str) -> None:
-        if not guild:
-            return
-        if not self.debug_enabled.get(guild.id, False):
+        # Günstigste Prüfung zuerst: meist ist Debug nirgends aktiv
+        if not guild or not self.debug_enabled or not self.debug_enabled.get(guild.id):
             return
         log_channel_id = self.config.get_int("music_log_channel_id")
         if not log_channel_id:
@@ -264,7 +405,7 @@ class Music(commands.Cog):
         channel = guild.get_channel(log_channel_id)
         if isinstance(channel, discord.TextChannel):
             try:
-                await channel.send(message[:1900])
+                await channel.send(message if len(message) <= 1900 else message[:1900])
             except discord.HTTPException:
                 pass
 
@@ -274,10 +415,8 @@ class Music(commands.Cog):
         guild = interaction.guild
         if guild is None:
             return None, None, "Diese Aktion funktioniert nur in einer Guild."
-        channel_obj = None
-        if interaction.channel_id:
-            channel_obj = guild.get_channel(interaction.channel_id)
-        allowed, message = self.check_music_channel(guild, interaction.channel_id, channel_obj=channel_obj)
+        # Kanalobjekt löst check_music_channel nur auf, wenn die ID nicht direkt passt
+        allowed, message = self.check_music_channel(guild, interaction.channel_id)
         if not allowed:
             return guild, None, message
         member = interaction.user
@@ -290,7 +429,7 @@ class Music(commands.Cog):
     def get_player(self, guild: discord.Guild) -> MusicPlayer:
         player = self.players.get(guild.id)
         if not player:
-            player = MusicPlayer(self.bot, guild.id, self.config.get("ffmpeg_path"))
+            player = MusicPlayer(self.bot, guild.id, self._ffmpeg_executable())
             self.players[guild.id] = player
         return player
 
@@ -298,28 +437,11 @@ class Music(commands.Cog):
         if not ctx.guild:
             return None, "Dieser Befehl kann nur in einer Guild genutzt werden."
         author = ctx.author
-        if not isinstance(author, discord.Member) or not author.voice or not author.voice.channel:
+        state = author.voice if isinstance(author, discord.Member) else None
+        channel = state.channel if state else None
+        if channel is None:
             return None, "Du musst zuerst in einen Voice Channel."
-        voice = ctx.voice_client
-        channel = author.voice.channel
-        if voice and voice.is_connected():
-            if voice.channel != channel:
-                try:
-                    await voice.move_to(channel)
-                except discord.DiscordException as exc:
-                    await self.send_debug(ctx.guild, f"Voice move_to fehlgeschlagen: {exc}")
-                    return None, "Konnte den Voice Channel nicht wechseln."
-            player = self.get_player(ctx.guild)
-            player.set_voice(voice)
-            return voice, None
-        try:
-            voice = await channel.connect()
-        except discord.DiscordException as exc:
-            await self.send_debug(ctx.guild, f"Voice connect fehlgeschlagen: {exc}")
-            return None, "Konnte dem Voice Channel nicht beitreten."
-        player = self.get_player(ctx.guild)
-        player.set_voice(voice)
-        return voice, None
+        return await self._connect_or_move(ctx.guild, channel)
 
     async def ensure_voice_interaction(
         self, interaction: discord.Interaction, member: discord.Member
@@ -327,71 +449,123 @@ class Music(commands.Cog):
         guild = interaction.guild
         if guild is None:
             return None, "Diese Aktion funktioniert nur in einer Guild."
-        if not member.voice or not member.voice.channel:
+        state = member.voice
+        channel = state.channel if state else None
+        if channel is None:
             return None, "Du musst zuerst in einen Voice Channel."
+        return await self._connect_or_move(guild, channel, " (Interaction)")
+
+    async def _connect_or_move(
+        self,
+        guild: discord.Guild,
+        channel: discord.abc.Connectable,
+        origin: str = "",
+    ) -> Tuple[Optional[discord.VoiceClient], Optional[str]]:
         voice = guild.voice_client
-        channel = member.voice.channel
         if voice and voice.is_connected():
             if voice.channel != channel:
                 try:
                     await voice.move_to(channel)
                 except discord.DiscordException as exc:
-                    await self.send_debug(guild, f"Voice move_to (Interaction) fehlgeschlagen: {exc}")
+                    await self.send_debug(guild, f"Voice move_to{origin} fehlgeschlagen: {exc}")
                     return None, "Konnte den Voice Channel nicht wechseln."
-            player = self.get_player(guild)
-            player.set_voice(voice)
-            return voice, None
-        try:
-            voice = await channel.connect()
-        except discord.DiscordException as exc:
-            await self.send_debug(guild, f"Voice connect (Interaction) fehlgeschlagen: {exc}")
-            return None, "Konnte dem Voice Channel nicht beitreten."
-        player = self.get_player(guild)
-        player.set_voice(voice)
+        else:
+            try:
+                # Taub beitreten: Discord schickt dann keine eingehenden Sprachpakete
+                voice = await channel.connect(self_deaf=True)
+            except discord.DiscordException as exc:
+                await self.send_debug(guild, f"Voice connect{origin} fehlgeschlagen: {exc}")
+                return None, "Konnte dem Voice Channel nicht beitreten."
+        self.get_player(guild).set_voice(voice)
         return voice, None
 
     async def create_track(self, query: str, requester: discord.Member) -> Track:
-        loop = asyncio.get_running_loop()
-        attempted_error: Optional[Exception] = None
-
-        async def extract(search_term: str) -> dict:
-            return await loop.run_in_executor(None, partial(self.ytdl.extract_info, search_term, download=False))
-
-        search_terms = [query]
-        if "://" not in query and not query.lower().startswith("ytsearch:"):
-            search_terms.append(f"ytsearch:{query}")
-
-        info: Optional[dict] = None
-        for term in search_terms:
-            try:
-                data = await extract(term)
-            except Exception as exc:  # yt_dlp wirft DownloadError u.a.
-                attempted_error = exc
-                continue
-            entries = data.get("entries") if isinstance(data, dict) else None
-            if entries:
-                # ytsearch liefert eine Playlist struktur zurück
-                first_entry = next((entry for entry in entries if entry), None)
-                if first_entry is None:
-                    attempted_error = RuntimeError("Keine Ergebnisse gefunden.")
-                    continue
-                data = first_entry
-            info = data
-            break
+        info = await self._extract_cached(query)
+        return Track(
+            title=info["title"],
+            stream_url=info["url"],
+            webpage_url=info["webpage_url"],
+            duration=info["duration"],
+            requester=requester,
+        )
 
-        if info is None:
-            raise attempted_error or RuntimeError("Keine Ergebnisse gefunden.")
+    async def _extract_cached(self, query: str) -> dict:
+        query = query.strip()
+        # URLs sind case-sensitiv (Video-IDs), nur Suchbegriffe normalisieren
+        key = query if "://" in query else query.lower()
+        info = self._cache_lookup(key)
+        if info is not None:
+            return info
+        lock = self._extract_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Gleichzeitige Anfragen für denselben Begriff nur einmal auflösen
+                info = self._cache_lookup(key)
+                if info is not None:
+                    return info
+                info = await self._extract_info(query)
+                self._extract_cache[key] = (time.time(), info)
+                self._extract_cache.move_to_end(key)
+                while len(self._extract_cache) > EXTRACT_CACHE_SIZE:
+                    self._extract_cache.popitem(last=False)
+                return info
+        finally:
+            if not lock.locked():
+                self._extract_locks.pop(key, None)
+
+    def _cache_lookup(self, key: str) -> Optional[dict]:
+        entry = self._extract_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, info = entry
+        if time.time() - stored_at > EXTRACT_CACHE_TTL:
+            del self._extract_cache[key]
+            return None
+        self._extract_cache.move_to_end(key)
+        return info
+
+    async def _extract_info(self, query: str) -> dict:
+        loop = asyncio.get_running_loop()
+        term = query
+        if "://" not in query and not query.lower().startswith("ytsearch"):
+            # Nur ein Treffer statt der fünf Standard-Ergebnisse von ytsearch
+            term = f"ytsearch1:{query}"
+        # yt_dlp wirft DownloadError u.a.; die Fehler werden vom Aufrufer gemeldet
+        info = await loop.run_in_executor(
+            self._ytdl_executor, partial(self.ytdl.extract_info, term, download=False)
+        )
+        if isinstance(info, dict) and "entries" in info:
+            # ytsearch liefert eine Playlist struktur zurück
+            info = next((entry for entry in info["entries"] or () if entry), None)
+        if not info:
+            raise RuntimeError("Keine Ergebnisse gefunden.")
 
         stream_url = info.get("url")
         if not stream_url:
             raise RuntimeError("Konnte keinen Stream für den Track finden.")
-        return Track(
-            title=info.get("title", "Unbekannt"),
-            stream_url=stream_url,
-            webpage_url=info.get("webpage_url", "https://youtube.com"),
-            duration=info.get("duration"),
-            requester=requester,
+        # Nur die benötigten Felder behalten, das volle Info-Dict ist sehr groß
+        return {
+            "title": info.get("title", "Unbekannt"),
+            "url": stream_url,
+            "webpage_url": info.get("webpage_url", "https://youtube.com"),
+            "duration": info.get("duration"),
+        }
+
+    async def _connect_and_extract(
+        self,
+        voice_call: Awaitable[Tuple[Optional[discord.VoiceClient], Optional[str]]],
+        query: str,
+        requester: discord.Member,
+    ) -> Tuple[Tuple[Optional[discord.VoiceClient], Optional[str]], Track | Exception]:
+        # Voice-Verbindung und yt-dlp-Suche sind unabhängig, also parallel ausführen
+        voice_result, track = await asyncio.gather(
+            voice_call, self.create_track(query, requester), return_exceptions=True
         )
+        if isinstance(voice_result, BaseException):
+            raise voice_result
+        if isinstance(track, BaseException) and not isinstance(track, Exception):
+            raise track
+        return voice_result, track
 
     async def process_modal_request(self, interaction: discord.Interaction, query: str) -> None:
         if not query.strip():
@@ -405,17 +579,17 @@ class Music(commands.Cog):
             return
         assert guild is not None and member is not None
         await interaction.response.defer(ephemeral=True, thinking=True)
-        voice, voice_error = await self.ensure_voice_interaction(interaction, member)
+        (voice, voice_error), track = await self._connect_and_extract(
+            self.ensure_voice_interaction(interaction, member), query, member
+        )
         if voice_error:
             await interaction.followup.send(voice_error, ephemeral=True)
             await self.send_debug(guild, f"Song-Modal Voice-Fehler: {voice_error}")
             return
         player = self.get_player(guild)
-        try:
-            track = await self.create_track(query, member)
-        except Exception as exc:
-            await interaction.followup.send(f"❌ Konnte den Song nicht laden: {exc}", ephemeral=True)
-            await self.send_debug(guild, f"Song-Modal: Fehler bei '{query}': {exc}")
+        if isinstance(track, Exception):
+            await interaction.followup.send(f"❌ Konnte den Song nicht laden: {track}", ephemeral=True)
+            await self.send_debug(guild, f"Song-Modal: Fehler bei '{query}': {track}")
             return
         await player.add_track(track)
         await interaction.followup.send(
@@ -472,20 +646,18 @@ class Music(commands.Cog):
                 await self.send_debug(ctx.guild, f"Play-Befehl verweigert: {member} besitzt keine DJ-Rolle.")
             return
         await self.send_ctx_message(ctx, content="🔄 Füge Song hinzu...", ephemeral=False)
-        voice, error = await self.ensure_voice(ctx)
+        await self.send_debug(ctx.guild, f"Play-Befehl: Suche nach '{query}' gestartet.")
+        (voice, error), track = await self._connect_and_extract(self.ensure_voice(ctx), query, member)
         if error:
             await self.send_ctx_message(ctx, content=f"❌ {error}")
             if ctx.guild:
                 await self.send_debug(ctx.guild, f"Play-Befehl: {error}")
             return
         player = self.get_player(ctx.guild)
-        await self.send_debug(ctx.guild, f"Play-Befehl: Suche nach '{query}' gestartet.")
-        try:
-            track = await self.create_track(query, member)
-        except Exception as exc:  # yt_dlp kann diverse Fehler werfen
-            error_msg = f"Konnte den Song nicht laden: {exc}"
+        if isinstance(track, Exception):  # yt_dlp kann diverse Fehler werfen
+            error_msg = f"Konnte den Song nicht laden: {track}"
             await self.send_ctx_message(ctx, content=f"❌ {error_msg}")
-            await self.send_debug(ctx.guild, f"Play-Befehl fehlgeschlagen bei '{query}': {exc}")
+            await self.send_debug(ctx.guild, f"Play-Befehl fehlgeschlagen bei '{query}': {track}")
             return
         await self.send_debug(ctx.guild, f"Play-Befehl: Track gefunden '{track.title}'.")
         await player.add_track(track)
@@ -570,17 +742,18 @@ class Music(commands.Cog):
             await self.send_debug(ctx.guild, "Queue-Befehl: Keine Queue vorhanden.")
             return
         player = self.players[ctx.guild.id]
-        items: List[Track] = player.queue_items()
-        embed = discord.Embed(title="Aktuelle Queue", color=discord.Color.blurple())
-        if player.current:
-            embed.add_field(name="Jetzt", value=f"**{player.current.title}** – angefragt von {player.current.requester.mention}", inline=False)
+        items: List[Track] = player.queue_head(10)
+        lines: List[str] = []
+        current = player.current
+        if current:
+            lines.append(f"**Jetzt:** **{current.title}** – angefragt von {current.requester.mention}")
         if items:
-            for idx, track in enumerate(items[:10], start=1):
-                embed.add_field(name=f"#{idx}", value=f"{track.title} – {track.requester.mention}", inline=False)
+            lines.extend(f"`#{idx}` {track.title} – {track.requester.mention}" for idx, track in enumerate(items, start=1))
         else:
-            embed.description = "Die Queue ist leer."
+            lines.append("Die Queue ist leer.")
+        embed = discord.Embed(title="Aktuelle Queue", description="\n".join(lines), color=discord.Color.blurple())
         await self.send_ctx_message(ctx, embed=embed)
-        await self.send_debug(ctx.guild, f"Queue-Befehl: {len(items)} Einträge gelistet.")
+        await self.send_debug(ctx.guild, f"Queue-Befehl: {player.queue_size()} Einträge gelistet.")
 
     @commands.hybrid_command(name="musicpanel", description="Stellt das Musikpanel bereit")
     @commands.has_permissions(manage_guild=True)
@@ -592,7 +765,7 @@ class Music(commands.Cog):
             await self.send_ctx_message(ctx, content="Kein gültiger Kanal für das Musikpanel konfiguriert.")
             return
         embed = build_music_panel_embed(self.config.get_int("dj_role_id"))
-        await target.send(embed=embed, view=MusicPanelView(self))
+        await target.send(embed=embed, view=self._panel_view)
         await self.send_ctx_message(ctx, content=f"Musikpanel in {target.mention} bereitgestellt.")
         await self.send_debug(ctx.guild, f"Musikpanel erneut bereitgestellt in {target.mention} durch {ctx.author}.")
 
@@ -620,13 +793,10 @@ class Music(commands.Cog):
         if new_state:
             await self.send_debug(guild, f"Musik-Debug aktiviert von {ctx.author} (Modus {mode}).")
 
-    async def handle_join_button(self, interaction: discord.Interaction) -> None:
-        guild, member, error = self.validate_interaction_member(interaction)
-        if error:
-            await self.send_interaction_message(interaction, content=error, ephemeral=True)
-            await self.send_debug(guild, f"Join-Button verweigert: {error}")
-            return
-        assert member is not None
+    @require_voice_member("Join-Button")
+    async def handle_join_button(
+        self, interaction: discord.Interaction, guild: discord.Guild, member: discord.Member
+    ) -> None:
         await interaction.response.defer(ephemeral=True, thinking=True)
         _voice, voice_error = await self.ensure_voice_interaction(interaction, member)
         if voice_error:
@@ -640,14 +810,10 @@ class Music(commands.Cog):
         await interaction.followup.send("Verbunden mit deinem Voice Channel.", ephemeral=True)
         await self.send_debug(guild, f"Join-Button erfolgreich ausgeführt durch {member}.")
 
-    async def handle_leave_button(self, interaction: discord.Interaction) -> None:
-        guild, member, error = self.validate_interaction_member(interaction)
-        if error:
-            await self.send_interaction_message(interaction, content=error, ephemeral=True)
-            await self.send_debug(guild, f"Leave-Button verweigert: {error}")
-            return
-        if guild is None:
-            return
+    @require_voice_member("Leave-Button")
+    async def handle_leave_button(
+        self, interaction: discord.Interaction, guild: discord.Guild, member: discord.Member
+    ) -> None:
         voice = guild.voice_client
         if voice and voice.is_connected():
             await voice.disconnect()
@@ -660,14 +826,10 @@ class Music(commands.Cog):
             await self.send_interaction_message(interaction, content="Ich bin aktuell mit keinem Channel verbunden.", ephemeral=True)
             await self.send_debug(guild, "Leave-Button: Bot war nicht verbunden.")
 
-    async def handle_skip_button(self, interaction: discord.Interaction) -> None:
-        guild, member, error = self.validate_interaction_member(interaction)
-        if error:
-            await self.send_interaction_message(interaction, content=error, ephemeral=True)
-            await self.send_debug(guild, f"Skip-Button verweigert: {error}")
-            return
-        if guild is None:
-            return
+    @require_voice_member("Skip-Button")
+    async def handle_skip_button(
+        self, interaction: discord.Interaction, guild: discord.Guild, member: discord.Member
+    ) -> None:
         player = self.players.get(guild.id)
         if player and player.skip_current():
             await self.send_interaction_message(interaction, content="Track übersprungen.", ephemeral=True)
@@ -676,14 +838,10 @@ class Music(commands.Cog):
             await self.send_interaction_message(interaction, content="Es läuft nichts zum Überspringen.", ephemeral=True)
             await self.send_debug(guild, "Skip-Button: Kein Track aktiv.")
 
-    async def handle_pause_button(self, interaction: discord.Interaction) -> None:
-        guild, member, error = self.validate_interaction_member(interaction)
-        if error:
-            await self.send_interaction_message(interaction, content=error, ephemeral=True)
-            await self.send_debug(guild, f"Pause-Button verweigert: {error}")
-            return
-        if guild is None:
-            return
+    @require_voice_member("Pause-Button")
+    async def handle_pause_button(
+        self, interaction: discord.Interaction, guild: discord.Guild, member: discord.Member
+    ) -> None:
         voice = guild.voice_client
         if voice and voice.is_playing():
             voice.pause()
@@ -693,14 +851,10 @@ class Music(commands.Cog):
             await self.send_interaction_message(interaction, content="Aktuell läuft kein Track.", ephemeral=True)
             await self.send_debug(guild, "Pause-Button: Kein Track aktiv.")
 
-    async def handle_resume_button(self, interaction: discord.Interaction) -> None:
-        guild, member, error = self.validate_interaction_member(interaction)
-        if error:
-            await self.send_interaction_message(interaction, content=error, ephemeral=True)
-            await self.send_debug(guild, f"Resume-Button verweigert: {error}")
-            return
-        if guild is None:
-            return
+    @require_voice_member("Resume-Button")
+    async def handle_resume_button(
+        self, interaction: discord.Interaction, guild: discord.Guild, member: discord.Member
+    ) -> None:
         voice = guild.voice_client
         if voice and voice.is_paused():
             voice.resume()
@@ -710,14 +864,10 @@ class Music(commands.Cog):
             await self.send_interaction_message(interaction, content="Es ist nichts pausiert.", ephemeral=True)
             await self.send_debug(guild, "Resume-Button: Keine pausierte Wiedergabe.")
 
-    async def handle_stop_button(self, interaction: discord.Interaction) -> None:
-        guild, member, error = self.validate_interaction_member(interaction)
-        if error:
-            await self.send_interaction_message(interaction, content=error, ephemeral=True)
-            await self.send_debug(guild, f"Stop-Button verweigert: {error}")
-            return
-        if guild is None:
-            return
+    @require_voice_member("Stop-Button")
+    async def handle_stop_button(
+        self, interaction: discord.Interaction, guild: discord.Guild, member: discord.Member
+    ) -> None:
         voice = guild.voice_client
         if voice:
             voice.stop()
@@ -730,11 +880,17 @@ class Music(commands.Cog):
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState) -> None:
-        if member.guild.id not in self.players:
+        player = self.players.get(member.guild.id)
+        if player is None or player.voice is None:
             return
-        player = self.players[member.guild.id]
         voice = player.voice
-        if voice and voice.channel and len(voice.channel.members) == 1 and voice.channel.members[0] == voice.guild.me:
+        channel = voice.channel
+        # Nur relevant, wenn jemand unseren Kanal verlassen hat
+        if channel is None or before.channel != channel or after.channel == channel:
+            return
+        # voice_states ist ein Dict nach User-ID, channel.members filtert dagegen alle Mitglieder
+        states = channel.voice_states
+        if len(states) == 1 and next(iter(states)) == voice.guild.me.id:
             await voice.disconnect()
             player.clear_queue()
 
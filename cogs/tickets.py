@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-import datetime as dt
-from typing import cast
+import asyncio
+import re
+from typing import Optional, cast
 
 import discord
 from discord.ext import commands
@@ -9,6 +10,23 @@ from discord.utils import utcnow
 
 from config import config_manager
 
+# Gleichzeitige add_user-Requests pro Ticket (schont das Rate-Limit der Route)
+ADD_USER_CONCURRENCY = 5
+
+
+async def _safe_add(
+    thread: discord.Thread, member: discord.abc.Snowflake, limiter: Optional[asyncio.Semaphore] = None
+) -> bool:
+    """Fügt ein Mitglied hinzu; gibt False zurück, wenn Discord den Request ablehnt."""
+    if limiter is not None:
+        async with limiter:
+            return await _safe_add(thread, member)
+    try:
+        await thread.add_user(member)
+    except discord.HTTPException:
+        return False
+    return True
+
 
 def build_ticket_panel_embed(admin_role_id: int | None) -> discord.Embed:
     description = (
@@ -35,10 +53,10 @@ class TicketPanelView(discord.ui.View):
         guild = interaction.guild
         if guild is None:
             return
-        config = self.bot.config
-        ticket_channel_id = config.get_int("ticket_channel_id")
-        ticket_queue_channel_id = config.get_int("ticket_queue_channel_id")
-        admin_role_id = config.get_int("admin_role_id")
+        config = self.bot.config.current
+        ticket_channel_id = config.ticket_channel_id
+        ticket_queue_channel_id = config.ticket_queue_channel_id
+        admin_role_id = config.admin_role_id
 
         if not ticket_channel_id:
             await interaction.response.send_message("Ticket-Kanal ist nicht konfiguriert.", ephemeral=True)
@@ -49,8 +67,12 @@ class TicketPanelView(discord.ui.View):
             await interaction.response.send_message("Ticket-Kanal konnte nicht gefunden werden.", ephemeral=True)
             return
 
+        # Mehrere REST-Aufrufe folgen: Antwortfenster von 3s verlängern
+        await interaction.response.defer(ephemeral=True)
         opener = interaction.user
-        thread_name = f"ticket-{opener.name}-{dt.datetime.utcnow().strftime('%H%M%S')}"
+        # Ein tz-aware Zeitpunkt für Threadname und Queue-Embed, HHMMSS ohne strftime
+        now = utcnow()
+        thread_name = f"ticket-{opener.name}-{now.hour:02d}{now.minute:02d}{now.second:02d}"
         thread = await ticket_channel.create_thread(
             name=thread_name,
             auto_archive_duration=1440,
@@ -61,12 +83,9 @@ class TicketPanelView(discord.ui.View):
         await thread.send(f"Ticket erstellt von {opener.mention}. Bitte warte, bis ein Admin es übernimmt.")
         admin_role = guild.get_role(admin_role_id)
         if admin_role:
-            for member in guild.members:
-                if admin_role in member.roles:
-                    try:
-                        await thread.add_user(member)
-                    except discord.HTTPException:
-                        continue
+            # role.members nutzt den Member-Cache direkt, statt alle Mitglieder zu prüfen
+            limiter = asyncio.Semaphore(ADD_USER_CONCURRENCY)
+            await asyncio.gather(*(_safe_add(thread, member, limiter) for member in admin_role.members))
 
         if ticket_queue_channel_id:
             queue_channel = guild.get_channel(ticket_queue_channel_id)
@@ -78,38 +97,59 @@ class TicketPanelView(discord.ui.View):
                 )
                 if admin_role_id:
                     embed.add_field(name="Erwartete Rolle", value=f"<@&{admin_role_id}>", inline=False)
-                embed.timestamp = dt.datetime.utcnow()
-                view = TicketClaimView(self.bot, thread.id, opener.id)
+                embed.timestamp = now
+                view = discord.ui.View(timeout=None)
+                view.add_item(TicketClaimButton(thread.id, opener.id))
                 await queue_channel.send(embed=embed, view=view)
 
-        await interaction.response.send_message(f"Ticket erstellt: {thread.mention}", ephemeral=True)
+        await interaction.followup.send(f"Ticket erstellt: {thread.mention}", ephemeral=True)
 
 
-class TicketClaimView(discord.ui.View):
-    def __init__(self, bot: commands.Bot, thread_id: int, opener_id: int) -> None:
-        super().__init__(timeout=86400)
-        self.bot = bot
+class TicketClaimButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"prime_ticket_claim:(?P<thread_id>[0-9]+):(?P<opener_id>[0-9]+)",
+):
+    """Zustandsloser Claim-Button: Thread und Ersteller stecken in der custom_id."""
+
+    def __init__(self, thread_id: int, opener_id: int) -> None:
+        super().__init__(
+            discord.ui.Button(
+                label="Ticket übernehmen",
+                style=discord.ButtonStyle.primary,
+                custom_id=f"prime_ticket_claim:{thread_id}:{opener_id}",
+            )
+        )
         self.thread_id = thread_id
         self.opener_id = opener_id
 
-    @discord.ui.button(label="Ticket übernehmen", style=discord.ButtonStyle.primary)
-    async def claim(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match[str]
+    ) -> "TicketClaimButton":
+        return cls(int(match["thread_id"]), int(match["opener_id"]))
+
+    async def callback(self, interaction: discord.Interaction) -> None:
         guild = interaction.guild
         if guild is None:
             return
         member = cast(discord.Member, interaction.user)
-        admin_role_id = self.bot.config.get_int("admin_role_id")
-        if admin_role_id and not any(role.id == admin_role_id for role in member.roles):
+        admin_role_id = config_manager.get_int("admin_role_id")
+        if admin_role_id and member.get_role(admin_role_id) is None:
             await interaction.response.send_message("Du hast keine Rechte für Tickets.", ephemeral=True)
             return
         thread = guild.get_thread(self.thread_id)
         if not thread:
             await interaction.response.send_message("Ticket existiert nicht mehr.", ephemeral=True)
             return
-        opener = guild.get_member(self.opener_id)
-        if opener:
-            await thread.add_user(opener)
-        await thread.add_user(member)
+        # add_user braucht nur die ID: kein Member-Cache-Zugriff für den Ersteller.
+        # Hat er den Server verlassen, schlägt nur sein Request fehl (_safe_add ignoriert das).
+        opener = discord.Object(id=self.opener_id)
+        _opener_added, claimed = await asyncio.gather(_safe_add(thread, opener), _safe_add(thread, member))
+        if not claimed:
+            await interaction.response.send_message(
+                "Du konntest dem Ticket nicht hinzugefügt werden.", ephemeral=True
+            )
+            return
         await interaction.response.send_message(f"{thread.mention} übernommen.", ephemeral=True)
         await thread.send(f"{member.mention} hat dieses Ticket übernommen.")
 
@@ -118,9 +158,15 @@ class Tickets(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.config = config_manager
+        # Persistente View mit fester custom_id: eine Instanz für Registrierung und alle Panels
+        self._panel_view = TicketPanelView(bot)
 
     async def cog_load(self) -> None:
-        self.bot.add_view(TicketPanelView(self.bot))
+        self.bot.add_view(self._panel_view)
+        self.bot.add_dynamic_items(TicketClaimButton)
+
+    async def cog_unload(self) -> None:
+        self.bot.remove_dynamic_items(TicketClaimButton)
 
     @commands.hybrid_command(name="ticketpanel", description="Sendet das Ticket-Panel in einen Kanal")
     @commands.has_permissions(manage_guild=True)
@@ -130,7 +176,7 @@ class Tickets(commands.Cog):
             await ctx.reply("Kein Zielkanal für das Panel konfiguriert.")
             return
         embed = build_ticket_panel_embed(self.config.get_int("admin_role_id"))
-        await target.send(embed=embed, view=TicketPanelView(self.bot))
+        await target.send(embed=embed, view=self._panel_view)
         await ctx.reply(f"Ticket-Panel in {target.mention} bereitgestellt.")
 
     @commands.hybrid_command(name="ticketclose", description="Ticket-Thread schließen")
@@ -52,9 +52,11 @@ class Verification(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.config = config_manager
+        # Persistente View mit fester custom_id: eine Instanz für Registrierung und alle Panels
+        self._verify_view = VerifyView(bot)
 
     async def cog_load(self) -> None:
-        self.bot.add_view(VerifyView(self.bot))
+        self.bot.add_view(self._verify_view)
 
     @commands.hybrid_command(name="verifypanel", description="Platziert das Verifizierungspanel")
     @commands.has_permissions(manage_roles=True)
@@ -64,7 +66,7 @@ class Verification(commands.Cog):
             await ctx.reply("Kein gültiger Kanal für Verifizierung gesetzt.")
             return
         embed = build_verify_embed(self.config.get_int("verified_role_id"))
-        await target.send(embed=embed, view=VerifyView(self.bot))
+        await target.send(embed=embed, view=self._verify_view)
         await ctx.reply(f"Verifizierungspanel in {target.mention} bereitgestellt.")
 
     @commands.Cog.listener()
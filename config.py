@@ -24,27 +24,10 @@ CONFIG_SCHEMA: Dict[str, Dict[str, Any]] = {
 	"enable_message_content_intent": {"type": bool, "default": True, "description": "Message Content Intent aktivieren."},
 	"enable_members_intent": {"type": bool, "default": True, "description": "Server Members Intent aktivieren."},
 	"enable_presence_intent": {"type": bool, "default": False, "description": "Presence Intent aktivieren."},
+	"asyncio_debug": {"type": bool, "default": False, "description": "asyncio-Debugmodus aktivieren (nur zur Entwicklung)."},
 }
 
-ENV_OVERRIDES = {
-	"command_prefix": os.getenv("COMMAND_PREFIX"),
-	"guild_id": os.getenv("GUILD_ID"),
-	"ticket_channel_id": os.getenv("TICKET_CHANNEL_ID"),
-	"ticket_panel_channel_id": os.getenv("TICKET_PANEL_CHANNEL_ID"),
-	"ticket_queue_channel_id": os.getenv("TICKET_QUEUE_CHANNEL_ID"),
-	"verify_channel_id": os.getenv("VERIFY_CHANNEL_ID"),
-	"music_channel_id": os.getenv("MUSIC_CHANNEL_ID"),
-	"music_log_channel_id": os.getenv("MUSIC_LOG_CHANNEL_ID"),
-	"admin_role_id": os.getenv("ADMIN_ROLE_ID"),
-	"verified_role_id": os.getenv("VERIFIED_ROLE_ID"),
-	"dj_role_id": os.getenv("DJ_ROLE_ID"),
-	"ffmpeg_path": os.getenv("FFMPEG_PATH"),
-	"enable_message_content_intent": os.getenv("ENABLE_MESSAGE_CONTENT_INTENT"),
-	"enable_members_intent": os.getenv("ENABLE_MEMBERS_INTENT"),
-	"enable_presence_intent": os.getenv("ENABLE_PRESENCE_INTENT"),
-}
-
-config_manager = ConfigManager(CONFIG_SCHEMA, overrides=ENV_OVERRIDES)
+config_manager = ConfigManager(CONFIG_SCHEMA, env_overrides=True)
 
 
 def get_token() -> str:
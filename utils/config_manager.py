@@ -1,58 +1,204 @@
+import asyncio
+import hashlib
 import json
+import logging
+import os
+from dataclasses import make_dataclass
 from pathlib import Path
 from typing import Any, Dict, Optional, Callable
 
+try:
+    import orjson
+except ImportError:  # optional, stdlib json als Fallback
+    orjson = None
+
+
+log = logging.getLogger(__name__)
+
+
+# Übliche Schreibweisen direkt nachschlagen; nur Exoten wie "tRuE" laufen über lower()
+_TRUTHY = frozenset(("1", "true", "yes", "on"))
+_BOOL_STRINGS: Dict[str, bool] = {
+    variant: word in _TRUTHY
+    for word in ("1", "true", "yes", "on", "0", "false", "no", "off", "")
+    for variant in (word, word.upper(), word.capitalize())
+}
+
 
 class ConfigManager:
     """Simple JSON-backed configuration helper with schema validation."""
 
+    SAVE_DELAY = 0.5
+
     def __init__(
         self,
         schema: Dict[str, Dict[str, Any]],
         storage_path: str = "data/config.json",
         overrides: Optional[Dict[str, Any]] = None,
+        env_overrides: bool = False,
     ) -> None:
         self.schema = schema
         self.file_path = Path(storage_path)
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
         self._data: Dict[str, Any] = {key: meta.get("default") for key, meta in schema.items()}
+        # Schema ist fest: Snapshot-Klasse einmalig erzeugen, Instanz bei Änderungen verwerfen
+        self.snapshot_type = make_dataclass(
+            "ConfigSnapshot",
+            [(key, meta.get("type", Any)) for key, meta in schema.items()],
+            frozen=True,
+            slots=True,
+        )
+        self._snapshot: Optional[Any] = None
+        self._version = 0
+        # Bereits konvertierte Werte für get_int/get_str, werden bei jeder Änderung verworfen
+        self._ints: Dict[str, int] = {}
+        self._strs: Dict[str, str] = {}
+        self._saved_digest: Optional[bytes] = None
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task[None]] = None
         self.load()
+        if env_overrides:
+            # Umgebungsvariable je Schlüssel in Großbuchstaben, z.B. GUILD_ID
+            environ = os.environ
+            overrides = {**{key: environ.get(key.upper()) for key in schema}, **(overrides or {})}
+        changed = False
         if overrides:
             for key, value in overrides.items():
                 if value not in (None, "") and key in self.schema:
-                    self._data[key] = self._cast_value(key, value)
-        self.save()
+                    value = self._cast_value(key, value)
+                    if self._data.get(key) != value:
+                        self._data[key] = value
+                        changed = True
+        # Nur schreiben, wenn Overrides etwas geändert haben oder die Datei noch fehlt
+        if changed or self._saved_digest is None:
+            self.save()
 
     # ------------------------------------------------------------------
     # Persistence helpers
     # ------------------------------------------------------------------
     def load(self) -> None:
-        if self.file_path.exists():
-            with self.file_path.open("r", encoding="utf-8") as handle:
-                stored = json.load(handle)
+        self._apply_stored(self._read_stored())
+
+    async def aload(self) -> None:
+        """Read the file in a worker thread, apply the values on the loop."""
+        self._apply_stored(await asyncio.to_thread(self._read_stored))
+
+    def _read_stored(self) -> Optional[bytes]:
+        try:
+            return self.file_path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _apply_stored(self, raw: Optional[bytes]) -> None:
+        if raw is not None:
+            self._saved_digest = self._digest(raw)
+            stored = json.loads(raw)
             for key, value in stored.items():
                 if key in self.schema:
                     self._data[key] = self._cast_value(key, value)
+        self._bump()
 
     def save(self) -> None:
-        with self.file_path.open("w", encoding="utf-8") as handle:
-            json.dump(self._data, handle, indent=2)
+        """Write the config synchronously; skipped when nothing changed on disk."""
+        self._dirty = False
+        self._write(self._serialize())
+
+    async def asave(self) -> None:
+        """Serialize on the loop, write the file in a worker thread."""
+        self._dirty = False
+        try:
+            await asyncio.to_thread(self._write, self._serialize())
+        except BaseException:
+            # Änderung bleibt offen, der nächste Save bzw. flush() versucht es erneut
+            self._dirty = True
+            raise
+
+    async def flush(self) -> None:
+        """Wait for a pending debounced save (call before shutdown)."""
+        task = self._save_task
+        if task is not None and not task.done():
+            await task
+        elif self._dirty:
+            await self.asave()
 
     def reset(self) -> None:
         self._data = {key: meta.get("default") for key, meta in self.schema.items()}
-        self.save()
+        self._bump()
+        self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Kein Event-Loop in diesem Thread (Start, Executor): direkt schreiben
+            self.save()
+            return
+        if self._save_task is None or self._save_task.done():
+            self._save_task = loop.create_task(self._delayed_save())
+
+    async def _delayed_save(self) -> None:
+        # Mehrere Änderungen innerhalb von SAVE_DELAY werden zu einem Schreibvorgang
+        while self._dirty:
+            await asyncio.sleep(self.SAVE_DELAY)
+            try:
+                await self.asave()
+            except Exception:
+                # Fire-and-forget-Task: Fehler hier loggen, _dirty bleibt für flush() gesetzt
+                log.exception("Konfiguration konnte nicht gespeichert werden: %s", self.file_path)
+                return
+
+    def _serialize(self) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(self._data, option=orjson.OPT_INDENT_2)
+        return json.dumps(self._data, indent=2).encode("utf-8")
+
+    def _write(self, payload: bytes) -> None:
+        digest = self._digest(payload)
+        if digest == self._saved_digest:
+            return
+        # Atomar ersetzen, damit ein Absturz keine halbe Datei hinterlässt
+        tmp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, self.file_path)
+        self._saved_digest = digest
+
+    @staticmethod
+    def _digest(payload: bytes) -> bytes:
+        return hashlib.blake2b(payload, digest_size=16).digest()
 
     # ------------------------------------------------------------------
     # Access helpers
     # ------------------------------------------------------------------
+    @property
+    def version(self) -> int:
+        """Counter that is bumped whenever the stored values change."""
+        return self._version
+
+    @property
+    def current(self) -> Any:
+        """Frozen snapshot of all values with one attribute per schema key."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._snapshot = self.snapshot_type(**self._data)
+        return snapshot
+
     def get(self, key: str, default: Optional[Any] = None) -> Any:
         return self._data.get(key, default)
 
     def get_int(self, key: str) -> int:
-        return int(self._data.get(key, 0) or 0)
+        try:
+            return self._ints[key]
+        except KeyError:
+            value = self._ints[key] = int(self._data.get(key, 0) or 0)
+            return value
 
     def get_str(self, key: str) -> str:
-        return str(self._data.get(key, ""))
+        try:
+            return self._strs[key]
+        except KeyError:
+            value = self._strs[key] = str(self._data.get(key, ""))
+            return value
 
     def items(self):
         return self._data.items()
@@ -65,14 +211,22 @@ class ConfigManager:
             raise KeyError(f"Unbekannter Konfigurationsschlüssel: {key}")
         value = self._cast_value(key, raw_value)
         self._data[key] = value
-        self.save()
+        self._bump()
+        self._schedule_save()
         return value
 
     def update_many(self, values: Dict[str, Any]) -> None:
         for key, value in values.items():
             if key in self.schema:
                 self._data[key] = self._cast_value(key, value)
-        self.save()
+        self._bump()
+        self._schedule_save()
+
+    def _bump(self) -> None:
+        self._version += 1
+        self._snapshot = None
+        self._ints.clear()
+        self._strs.clear()
 
     # ------------------------------------------------------------------
     def _cast_value(self, key: str, value: Any) -> Any:
@@ -82,7 +236,8 @@ class ConfigManager:
             return value
         if expected_type is bool:
             if isinstance(value, str):
-                return value.lower() in {"1", "true", "yes", "on"}
+                result = _BOOL_STRINGS.get(value)
+                return result if result is not None else value.lower() in _TRUTHY
             return bool(value)
         try:
             return expected_type(value)
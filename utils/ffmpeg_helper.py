@@ -1,25 +1,84 @@
 from __future__ import annotations
 
+import functools
+import hashlib
+import io
+import logging
 import os
 import platform
 import shutil
 import tarfile
-import tempfile
 import urllib.request
 from pathlib import Path
 from typing import Optional
 
 from config import config_manager
 
+log = logging.getLogger(__name__)
+
+
 # URLs for prebuilt static ffmpeg binaries by platform
 LINUX_AMD64_URL = "https://johnvansickle.com/ffmpeg/releases/ffmpeg-release-amd64-static.tar.xz"
+# The release archive changes with every ffmpeg release; its checksum is published next to it.
+# The MD5 comes from the same host over the same channel as the archive, so checking it only
+# detects corrupted or truncated downloads. It is an integrity check, NOT an authenticity check:
+# a tampered server can serve a matching checksum. Pin a SHA-256 of a versioned release for that.
+LINUX_AMD64_MD5_URL = LINUX_AMD64_URL + ".md5"
+
+# Copy buffer bounds for streaming downloads
+MIN_COPY_BUFFER = 64 * 1024
+MAX_COPY_BUFFER = 1024 * 1024
+
+# Path returned by the last successful ensure_ffmpeg() in this process
+_ensured_path: Optional[str] = None
 
 
 def _is_executable(path: Path) -> bool:
     return path.exists() and path.is_file() and os.access(path, os.X_OK)
 
 
+class _HashingReader(io.RawIOBase):
+    """Raw stream wrapper that hashes every byte read through it."""
+
+    def __init__(self, raw) -> None:
+        self._raw = raw
+        self.hash = hashlib.md5(usedforsecurity=False)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = self._raw.readinto(buffer)
+        if count:
+            self.hash.update(memoryview(buffer)[:count])
+        return count
+
+
+def _published_md5() -> str:
+    with urllib.request.urlopen(LINUX_AMD64_MD5_URL, timeout=30) as resp:
+        # Format: "<hex digest>  <file name>"
+        return resp.read().split(None, 1)[0].decode("ascii").lower()
+
+
+def _copy_buffer_size(size: int | None) -> int:
+    # Small files don't need a 1 MiB buffer; unknown sizes get the maximum
+    if not size:
+        return MAX_COPY_BUFFER
+    return max(MIN_COPY_BUFFER, min(MAX_COPY_BUFFER, size))
+
+
 def _resolve_ffmpeg(path_hint: str | None) -> Optional[str]:
+    resolved = _resolve_ffmpeg_cached(path_hint, os.environ.get("PATH", ""))
+    if resolved and not os.access(resolved, os.X_OK):
+        # Binary vanished since it was cached
+        _resolve_ffmpeg_cached.cache_clear()
+        resolved = _resolve_ffmpeg_cached(path_hint, os.environ.get("PATH", ""))
+    return resolved
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_ffmpeg_cached(path_hint: str | None, _search_path: str) -> Optional[str]:
+    # _search_path only keys the cache: a changed PATH means a fresh lookup
     if path_hint:
         candidate = Path(path_hint)
         if candidate.is_absolute() or candidate.exists():
@@ -42,7 +101,10 @@ def _resolve_ffmpeg(path_hint: str | None) -> Optional[str]:
 
 def ensure_ffmpeg(config=config_manager) -> Optional[str]:
     """Ensure ffmpeg is available; download static build if missing."""
+    global _ensured_path
     current = config.get("ffmpeg_path", "ffmpeg")
+    if _ensured_path and current == _ensured_path:
+        return _ensured_path
     resolved = _resolve_ffmpeg(current)
     if resolved:
         if resolved != current:
@@ -50,6 +112,7 @@ def ensure_ffmpeg(config=config_manager) -> Optional[str]:
                 config.set_value("ffmpeg_path", resolved)
             except Exception:
                 pass
+        _ensured_path = resolved
         return resolved
 
     system = platform.system().lower()
@@ -61,29 +124,46 @@ def ensure_ffmpeg(config=config_manager) -> Optional[str]:
         dest_path = dest_dir / "ffmpeg"
         if _is_executable(dest_path):
             config.set_value("ffmpeg_path", str(dest_path))
-            return str(dest_path)
+            _ensured_path = str(dest_path)
+            return _ensured_path
+        partial_path = dest_path.with_name(dest_path.name + ".part")
         try:
-            with tempfile.TemporaryDirectory() as tmp_dir:
-                archive_path = Path(tmp_dir) / "ffmpeg.tar.xz"
-                print("FFmpeg nicht gefunden. Lade statisches Linux-Build herunter...")
-                urllib.request.urlretrieve(LINUX_AMD64_URL, archive_path)
-                with tarfile.open(archive_path) as tar:
-                    members = [m for m in tar.getmembers() if m.isfile() and m.name.endswith("/ffmpeg")]
-                    if not members:
+            log.info("FFmpeg nicht gefunden. Lade statisches Linux-Build herunter...")
+            # Stream the archive through the xz decoder; only the ffmpeg binary touches the disk
+            expected_md5 = _published_md5()
+            with urllib.request.urlopen(LINUX_AMD64_URL, timeout=30) as resp:
+                hashing = _HashingReader(resp)
+                # The LZMA decoder asks for small chunks; a 1 MiB buffer keeps socket reads large
+                with io.BufferedReader(hashing, buffer_size=MAX_COPY_BUFFER) as buffered, tarfile.open(
+                    fileobj=buffered, mode="r|xz"
+                ) as tar:
+                    for member in tar:
+                        if member.isfile() and member.name.endswith("/ffmpeg"):
+                            source = tar.extractfile(member)
+                            with source, open(partial_path, "wb", buffering=0) as handle:
+                                shutil.copyfileobj(source, handle, _copy_buffer_size(member.size))
+                            break
+                    else:
                         raise RuntimeError("Konnte ffmpeg-Binary im Archiv nicht finden.")
-                    ffmpeg_member = members[0]
-                    tar.extract(ffmpeg_member, path=tmp_dir)
-                    extracted_path = Path(tmp_dir) / ffmpeg_member.name
-                    shutil.copy2(extracted_path, dest_path)
-                    dest_path.chmod(0o755)
-                config.set_value("ffmpeg_path", str(dest_path))
-                print(f"FFmpeg bereitgestellt unter {dest_path}.")
-                return str(dest_path)
+                    # Rest of the archive only needs hashing, not decompressing
+                    while buffered.read(MAX_COPY_BUFFER):
+                        pass
+            # Integrity only (transfer corruption), see LINUX_AMD64_MD5_URL
+            if hashing.hash.hexdigest() != expected_md5:
+                raise RuntimeError("Prüfsumme des FFmpeg-Archivs stimmt nicht.")
+            partial_path.chmod(0o755)
+            os.replace(partial_path, dest_path)
+            config.set_value("ffmpeg_path", str(dest_path))
+            log.info("FFmpeg bereitgestellt unter %s.", dest_path)
+            _resolve_ffmpeg_cached.cache_clear()
+            _ensured_path = str(dest_path)
+            return _ensured_path
         except Exception as exc:
-            print(f"Automatischer Download von FFmpeg fehlgeschlagen: {exc}")
+            partial_path.unlink(missing_ok=True)
+            log.warning("Automatischer Download von FFmpeg fehlgeschlagen: %s", exc)
             return None
 
-    print("FFmpeg konnte nicht automatisch bereitgestellt werden. Bitte installiere ffmpeg und setze FFMPEG_PATH.")
+    log.warning("FFmpeg konnte nicht automatisch bereitgestellt werden. Bitte installiere ffmpeg und setze FFMPEG_PATH.")
     return None
 
 
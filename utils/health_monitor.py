@@ -1,14 +1,79 @@
 ﻿from __future__ import annotations
 
 import asyncio
+import functools
+import heapq
 import html
+import logging
+import sys
 import time
 from collections import defaultdict, deque
 from dataclasses import dataclass
-from typing import Any, Deque, Dict, List, Optional
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 
-@dataclass
+log = logging.getLogger(__name__)
+
+
+# Kurze, wiederkehrende Zellen (Routen, Zahlen, Überschriften) nur einmal escapen
+_ESCAPE_CACHE_MAX_LEN = 64
+_escape_cached = functools.lru_cache(maxsize=1024)(html.escape)
+
+
+def _esc(value: str) -> str:
+    if len(value) < _ESCAPE_CACHE_MAX_LEN:
+        return _escape_cached(value)
+    return html.escape(value)
+
+
+@functools.lru_cache(maxsize=1024)
+def _clock_time(second: int) -> str:
+    # Events derselben Sekunde teilen sich einen strftime-Aufruf
+    return time.strftime("%H:%M:%S", time.localtime(second))
+
+
+# aiohttp liefert die Methode bereits groß geschrieben; Kleinschreibung wird hier normalisiert
+_HTTP_METHODS: Dict[str, str] = {}
+for _method in ("GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"):
+    _HTTP_METHODS[_method] = _HTTP_METHODS[_method.lower()] = _method
+del _method
+
+
+# Häufige Statuscodes vorbelegen, damit das Dict beim Hochlaufen nicht wachsen muss
+_COMMON_STATUS_CODES = (200, 204, 301, 302, 304, 400, 401, 403, 404, 405, 500, 502, 503)
+
+
+# Einträge der Ringpuffer als Tupel; Dicts entstehen erst im Snapshot
+HttpRecord = Tuple[int, str, str, int, float]
+TaskRecord = Tuple[int, str, float, Dict[str, Any]]
+_HTTP_FIELDS = ("timestamp", "method", "path", "status", "duration_ms")
+_TASK_FIELDS = ("timestamp", "name", "duration_ms", "context")
+
+
+# Feste HTML-Bausteine für das Dashboard
+_TABLE_OPEN = "<table class='list-table compact'>"
+_TABLE_CLOSE = "</tbody></table>"
+_EMPTY_ROW = "<tr><td colspan='4'>Keine Daten</td></tr>"
+
+
+@functools.lru_cache(maxsize=16)
+def _row_template(columns: int, cell: str = "td") -> str:
+    # Einmal erzeugte %-Vorlage je Spaltenzahl statt f-String und join pro Zelle
+    return "<tr>" + f"<{cell}>%s</{cell}>" * columns + "</tr>"
+
+
+_PANEL_GRID = (
+    "<div class='panel-grid'>"
+    "<div class='panel'>{general}</div>"
+    "<div class='panel'>{http}</div>"
+    "<div class='panel'>{tasks}</div>"
+    "<div class='panel'>{events}</div>"
+    "</div>"
+)
+
+
+@dataclass(slots=True)
 class RollingMetric:
     count: int = 0
     total: float = 0.0
@@ -29,10 +94,19 @@ class RollingMetric:
         return self.total / self.count
 
 
+def _sum_members(guilds: List[Any]) -> int:
+    return sum(getattr(guild, "member_count", 0) or len(getattr(guild, "members", [])) for guild in guilds)
+
+
 class HealthMonitor:
     """Collects lightweight runtime metrics for the bot and dashboard."""
 
     UPDATE_INTERVAL = 10.0
+    # Guild-/Member-Zähler laufen über Events mit, vollständiger Abgleich alle N Durchläufe
+    RECONCILE_EVERY = 30
+    # Anzahl der neuesten HTTP-/Task-Einträge im Snapshot
+    RECENT_LIMIT = 20
+    PENDING_TASKS_TTL = 1.0
 
     def __init__(self, bot: Any) -> None:
         self.bot = bot
@@ -44,24 +118,47 @@ class HealthMonitor:
         self.voice_connections: int = 0
         self.pending_tasks: int = 0
         self._loop_task: Optional[asyncio.Task[None]] = None
-        self._http_metrics: Dict[str, RollingMetric] = {}
-        self._http_status: Dict[int, int] = defaultdict(int)
-        self._http_recent: Deque[Dict[str, Any]] = deque(maxlen=40)
+        # HTTP-Metriken als parallele Listen (Struct of Arrays), Index je Route
+        self._http_index: Dict[str, int] = {}
+        self._http_routes: List[str] = []
+        self._http_count: List[int] = []
+        self._http_total: List[float] = []
+        self._http_max: List[float] = []
+        self._http_last: List[float] = []
+        self._http_status: Dict[int, int] = defaultdict(int, dict.fromkeys(_COMMON_STATUS_CODES, 0))
+        self._http_recent: Deque[HttpRecord] = deque(maxlen=40)
         self._task_metrics: Dict[str, RollingMetric] = {}
-        self._task_recent: Deque[Dict[str, Any]] = deque(maxlen=40)
-        self._events: Deque[Dict[str, Any]] = deque(maxlen=40)
+        self._task_recent: Deque[TaskRecord] = deque(maxlen=40)
+        self._events: Deque[TaskRecord] = deque(maxlen=40)
         self._gauges: Dict[str, float] = {}
         self._lock = asyncio.Lock()
+        self._collect_runs = 0
+        self._pending_checked_at = float("-inf")
+        self._listeners = (
+            (self._on_guild_join, "on_guild_join"),
+            (self._on_guild_remove, "on_guild_remove"),
+            (self._on_member_join, "on_member_join"),
+            (self._on_member_remove, "on_member_remove"),
+            (self._on_ready, "on_ready"),
+        )
 
     async def start(self) -> None:
         if self._loop_task is not None:
             return
+        add_listener = getattr(self.bot, "add_listener", None)
+        if add_listener is not None:
+            for listener, event in self._listeners:
+                add_listener(listener, event)
         self._loop_task = self.bot.loop.create_task(self._update_loop(), name="health-monitor")
 
     async def shutdown(self) -> None:
         task = self._loop_task
         if task is None:
             return
+        remove_listener = getattr(self.bot, "remove_listener", None)
+        if remove_listener is not None:
+            for listener, event in self._listeners:
+                remove_listener(listener, event)
         task.cancel()
         try:
             await task
@@ -79,45 +176,74 @@ class HealthMonitor:
 
     async def collect_guild_metrics(self) -> None:
         async with self._lock:
-            latency = getattr(self.bot, "latency", None)
-            self.latency_ms = float(latency * 1000) if latency is not None else 0.0
-            guilds = list(getattr(self.bot, "guilds", []))
-            self.guild_count = len(guilds)
-            self.member_count = sum(
-                getattr(guild, "member_count", 0) or len(getattr(guild, "members", []))
-                for guild in guilds
-            )
-            voice_clients = getattr(self.bot, "voice_clients", [])
-            self.voice_connections = sum(1 for client in voice_clients if client and client.is_connected())
-            self.pending_tasks = sum(1 for task in asyncio.all_tasks() if not task.done())
+            await self._collect_guild_metrics_locked()
+
+    async def _collect_guild_metrics_locked(self) -> None:
+        # Aufrufer hält self._lock
+        latency = getattr(self.bot, "latency", None)
+        self.latency_ms = float(latency * 1000) if latency is not None else 0.0
+        if self._collect_runs % self.RECONCILE_EVERY == 0:
+            await self._reconcile_counts()
+        self._collect_runs += 1
+        voice_clients = getattr(self.bot, "voice_clients", [])
+        self.voice_connections = sum(1 for client in voice_clients if client and client.is_connected())
+        now = time.monotonic()
+        if now - self._pending_checked_at >= self.PENDING_TASKS_TTL:
+            # all_tasks() enthält ohnehin nur noch nicht beendete Tasks
+            self.pending_tasks = len(asyncio.all_tasks())
+            self._pending_checked_at = now
+
+    async def _reconcile_counts(self) -> None:
+        guilds = list(getattr(self.bot, "guilds", []))
+        self.guild_count = len(guilds)
+        # Bewusst auf der Loop: guild.members liest Dicts, die die Loop parallel verändert,
+        # und reine Attributzugriffe gewinnen unter dem GIL in einem Thread nichts
+        self.member_count = _sum_members(guilds)
+
+    async def _on_ready(self) -> None:
+        # Nach (Re-)Connect ist der Guild-Cache neu aufgebaut
+        await self._reconcile_counts()
+
+    async def _on_guild_join(self, guild: Any) -> None:
+        self.guild_count += 1
+        self.member_count += getattr(guild, "member_count", 0) or 0
+
+    async def _on_guild_remove(self, guild: Any) -> None:
+        self.guild_count = max(0, self.guild_count - 1)
+        self.member_count = max(0, self.member_count - (getattr(guild, "member_count", 0) or 0))
+
+    async def _on_member_join(self, _member: Any) -> None:
+        self.member_count += 1
+
+    async def _on_member_remove(self, _member: Any) -> None:
+        self.member_count = max(0, self.member_count - 1)
 
     def record_http_request(self, method: str, path: str, duration_ms: float, status: int) -> None:
-        route = path.split("?", 1)[0]
-        key = f"{method.upper()} {route}"
-        metric = self._http_metrics.setdefault(key, RollingMetric())
-        metric.add(duration_ms)
+        # Jeder Request bringt eine neue Pfad-Kopie mit; interniert teilen sich
+        # die 40 Einträge im Ringpuffer ein Objekt pro Route
+        route = sys.intern(path.split("?", 1)[0])
+        method = _HTTP_METHODS.get(method) or method.upper()
+        key = f"{method} {route}"
+        index = self._http_index.get(key)
+        if index is None:
+            index = self._http_index[key] = len(self._http_routes)
+            self._http_routes.append(key)
+            self._http_count.append(0)
+            self._http_total.append(0.0)
+            self._http_max.append(0.0)
+            self._http_last.append(0.0)
+        self._http_count[index] += 1
+        self._http_total[index] += duration_ms
+        self._http_last[index] = duration_ms
+        if duration_ms > self._http_max[index]:
+            self._http_max[index] = duration_ms
         self._http_status[status] += 1
-        self._http_recent.appendleft(
-            {
-                "timestamp": time.time(),
-                "method": method.upper(),
-                "path": route,
-                "status": status,
-                "duration_ms": duration_ms,
-            }
-        )
+        self._http_recent.append((time.monotonic_ns(), method, route, status, duration_ms))
 
     def record_bot_task(self, name: str, duration_ms: float, context: Optional[Dict[str, Any]] = None) -> None:
         metric = self._task_metrics.setdefault(name, RollingMetric())
         metric.add(duration_ms)
-        self._task_recent.appendleft(
-            {
-                "timestamp": time.time(),
-                "name": name,
-                "duration_ms": duration_ms,
-                "context": context or {},
-            }
-        )
+        self._task_recent.append((time.monotonic_ns(), name, duration_ms, context or {}))
         if duration_ms > 10_000:
             self._record_event(
                 name="task.slow",
@@ -132,38 +258,33 @@ class HealthMonitor:
         return self._gauges.get(name, default)
 
     def _record_event(self, *, name: str, duration_ms: float, context: Optional[Dict[str, Any]] = None) -> None:
-        entry = {
-            "timestamp": time.time(),
-            "name": name,
-            "duration_ms": duration_ms,
-            "context": context or {},
-        }
-        self._events.appendleft(entry)
-        print(
-            f"[HealthMonitor] Event {name} duration={duration_ms:.1f}ms context={entry['context']}"
-        )
+        context = context or {}
+        self._events.append((time.monotonic_ns(), name, duration_ms, context))
+        log.warning("Event %s duration=%.1fms context=%s", name, duration_ms, context)
 
     async def snapshot(self) -> Dict[str, Any]:
-        await self.collect_guild_metrics()
         async with self._lock:
+            await self._collect_guild_metrics_locked()
             uptime_seconds = time.monotonic() - self._started_monotonic
-            http_total_count = sum(metric.count for metric in self._http_metrics.values())
-            http_total_ms = sum(metric.total for metric in self._http_metrics.values())
+            # Einträge speichern monotonic_ns; Umrechnung in Wanduhrzeit einmal pro Snapshot
+            wall_offset = time.time() - time.monotonic()
+            counts = self._http_count
+            totals = self._http_total
+            http_total_count = sum(counts)
+            http_total_ms = sum(totals)
             http_avg_ms = http_total_ms / http_total_count if http_total_count else 0.0
+            # Jede Route hat mindestens einen Aufruf, count ist nie 0
+            http_averages = [total / count for total, count in zip(totals, counts)]
             http_stats = [
                 {
-                    "route": key,
-                    "count": metric.count,
-                    "avg_ms": metric.average,
-                    "max_ms": metric.maximum,
-                    "last_ms": metric.last,
+                    "route": self._http_routes[index],
+                    "count": counts[index],
+                    "avg_ms": http_averages[index],
+                    "max_ms": self._http_max[index],
+                    "last_ms": self._http_last[index],
                 }
-                for key, metric in sorted(
-                    self._http_metrics.items(),
-                    key=lambda item: item[1].average,
-                    reverse=True,
-                )
-            ][:8]
+                for index in heapq.nlargest(8, range(len(http_averages)), key=http_averages.__getitem__)
+            ]
             task_stats = [
                 {
                     "name": key,
@@ -172,12 +293,8 @@ class HealthMonitor:
                     "max_ms": metric.maximum,
                     "last_ms": metric.last,
                 }
-                for key, metric in sorted(
-                    self._task_metrics.items(),
-                    key=lambda item: item[1].average,
-                    reverse=True,
-                )
-            ][:8]
+                for key, metric in heapq.nlargest(8, self._task_metrics.items(), key=lambda item: item[1].average)
+            ]
 
             return {
                 "status": "ok",
@@ -190,14 +307,26 @@ class HealthMonitor:
                 "pending_tasks": self.pending_tasks,
                 "http_avg_ms": http_avg_ms,
                 "http": http_stats,
-                "http_recent": list(self._http_recent),
-                "http_status": dict(self._http_status),
+                # Ringpuffer sind ältester-zuerst, der Snapshot liefert neueste zuerst
+                "http_recent": self._recent_entries(self._http_recent, _HTTP_FIELDS, wall_offset, self.RECENT_LIMIT),
+                "http_status": {code: count for code, count in self._http_status.items() if count},
                 "tasks": task_stats,
-                "task_recent": list(self._task_recent),
+                "task_recent": self._recent_entries(self._task_recent, _TASK_FIELDS, wall_offset, self.RECENT_LIMIT),
                 "gauges": dict(self._gauges),
-                "events": list(self._events),
+                "events": self._recent_entries(self._events, _TASK_FIELDS, wall_offset),
             }
 
+    @staticmethod
+    def _recent_entries(
+        ring: Deque[tuple], fields: Tuple[str, ...], wall_offset: float, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        entries = []
+        for record in islice(reversed(ring), limit):
+            entry = dict(zip(fields, record))
+            entry["timestamp"] = wall_offset + record[0] / 1e9
+            entries.append(entry)
+        return entries
+
     def render_table(self, snapshot: Optional[Dict[str, Any]] = None) -> str:
         snap = snapshot or {}
         general_rows = [
@@ -242,7 +371,7 @@ class HealthMonitor:
 
         recent_rows = [
             (
-                time.strftime("%H:%M:%S", time.localtime(event.get("timestamp", 0.0))),
+                _clock_time(int(event.get("timestamp", 0.0))),
                 event.get("name", "-"),
                 f"{event.get('duration_ms', 0.0):.1f} ms",
             )
@@ -254,13 +383,8 @@ class HealthMonitor:
             headers=("Time", "Name", "Duration"),
         )
 
-        return (
-            "<div class='panel-grid'>"
-            f"<div class='panel'>{general_html}</div>"
-            f"<div class='panel'>{http_html}</div>"
-            f"<div class='panel'>{task_html}</div>"
-            f"<div class='panel'>{events_html}</div>"
-            "</div>"
+        return _PANEL_GRID.format_map(
+            {"general": general_html, "http": http_html, "tasks": task_html, "events": events_html}
         )
 
     def _render_simple_table(
@@ -270,23 +394,13 @@ class HealthMonitor:
         *,
         headers: Optional[tuple[str, ...]] = None,
     ) -> str:
-        escaped_title = html.escape(title)
+        escaped_title = _esc(title)
         head_html = ""
         if headers:
-            header_cells = "".join(f"<th>{html.escape(col)}</th>" for col in headers)
-            head_html = f"<thead><tr>{header_cells}</tr></thead>"
-        body_cells = "".join(
-            "<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>"
-            for row in rows
-        )
-        if not body_cells:
-            body_cells = "<tr><td colspan='4'>Keine Daten</td></tr>"
-        return (
-            f"<h4>{escaped_title}</h4>"
-            "<table class='list-table compact'>"
-            f"{head_html}"
-            f"<tbody>{body_cells}</tbody>"
-            "</table>"
+            head_html = "<thead>" + _row_template(len(headers), "th") % tuple(map(_esc, headers)) + "</thead>"
+        body_cells = "".join(_row_template(len(row)) % tuple(map(_esc, row)) for row in rows)
+        return "".join(
+            ("<h4>", escaped_title, "</h4>", _TABLE_OPEN, head_html, "<tbody>", body_cells or _EMPTY_ROW, _TABLE_CLOSE)
         )
 
     @staticmethod
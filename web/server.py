@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 import html
+import itertools
+import logging
 import os
 import re
 import secrets
 import time
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Optional, List, cast
+from typing import Any, Callable, Dict, Iterable, Optional, List, Tuple, cast
 from urllib.parse import quote
 
 import discord
@@ -18,8 +21,43 @@ from discord.ext import commands
 
 from utils.config_manager import ConfigManager
 
+log = logging.getLogger(__name__)
+
+
 COOKIE_NAME = "primeblocks_session"
 
+# AllowedMentions je (everyone, roles, users); discord.py verändert die Objekte beim Senden nicht
+_ALLOWED_MENTIONS: Dict[Tuple[bool, bool, bool], AllowedMentions] = {
+    (everyone, roles, users): AllowedMentions(everyone=everyone, roles=roles, users=users)
+    for everyone, roles, users in itertools.product((False, True), repeat=3)
+}
+
+_TIMESPAN_RE = re.compile(r"(\d+)([smhd])")
+_TIMESPAN_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+_CONFIG_CARD_TMPL = (
+    "<div class='config-card'>"
+    "<span class='config-key'>%s</span>"
+    "<div class='config-value'>%s</div>"
+    "<form class='config-inline' method='post' action='/config'>"
+    "<input type='hidden' name='redirect' value='%s'>"
+    "<input type='hidden' name='key' value='%s'>"
+    "<input name='value' placeholder='Neuer Wert' value='%s'>"
+    "<button type='submit'>Speichern</button>"
+    "</form>"
+    "<span class='config-meta'>Typ: %s • Default: %s</span>"
+    "<p class='config-desc'>%s</p>"
+    "</div>"
+)
+
+# Nach diesen Events kann _primary_guild eine andere (oder neu aufgebaute) Guild liefern
+_GUILD_CACHE_EVENTS = ("on_ready", "on_guild_join", "on_guild_remove")
+
+# Ohne Login erreichbar; alle anderen Routen prüft _auth_middleware
+PUBLIC_PATHS = frozenset(("/login", "/logout", "/health"))
+
+COGS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cogs")
+
 ROLE_TARGETS = {
     "admin": ("admin_role_id", "Admin Rolle"),
     "verified": ("verified_role_id", "Verified Rolle"),
@@ -27,7 +65,199 @@ ROLE_TARGETS = {
 }
 
 
+# Statisches Seitengerüst einmalig als Bytes; pro Request kommen nur Untertitel, Banner und Inhalt hinzu
+_NAV_TABS = (
+    ("dashboard", "Dashboard", "/"),
+    ("members", "Members", "/members"),
+    ("announcements", "Announcements", "/announcements"),
+    ("roles", "Roles", "/roles"),
+    ("modlog", "Mod Log", "/modlog"),
+    ("music", "Music", "/music"),
+    ("cogs", "Cogs", "/cogs"),
+)
+
+_LAYOUT_CSS = """
+<style>@import url('https://fonts.googleapis.com/css2?family=Oxanium:wght@400;500;600;700&family=Montserrat:wght@400;600&display=swap');
+:root{--bg:#050818;--panel:#0b1229;--panel-soft:#111a3d;--accent:#615bff;--accent-2:#7f5bff;--accent-3:#56b4ff;--muted:#8790c9;--text:#eef2ff;--border:rgba(116,128,255,0.28);--shadow:0 28px 68px rgba(6,10,30,0.55);--radius:22px;}
+*{box-sizing:border-box;scrollbar-width:thin;scrollbar-color:rgba(120,140,255,0.55) transparent;}
+body{margin:0;background:radial-gradient(circle at top,#131c44 0%,#050818 52%,#050818 100%);font-family:'Montserrat',sans-serif;color:var(--text);min-height:100vh;}
+body::-webkit-scrollbar{width:8px;height:8px;}
+body::-webkit-scrollbar-thumb{background:rgba(120,140,255,0.55);border-radius:999px;}
+.dashboard{max-width:1280px;margin:0 auto;padding:42px 30px 90px;display:flex;flex-direction:column;gap:32px;}
+.topbar{display:flex;align-items:center;justify-content:space-between;padding:26px 30px;border-radius:var(--radius);background:linear-gradient(135deg,rgba(28,35,73,0.95),rgba(13,18,44,0.92));border:1px solid var(--border);box-shadow:var(--shadow);gap:26px;}
+.logo{width:58px;height:58px;border-radius:18px;background:linear-gradient(135deg,#5f5bff,#7c5bff);display:flex;align-items:center;justify-content:center;box-shadow:0 18px 36px rgba(95,91,255,0.45);}
+.logo svg{width:30px;height:30px;fill:#06081a;}
+.titles h1{margin:0;font-family:'Oxanium',cursive;font-size:28px;letter-spacing:0.1em;text-transform:uppercase;color:var(--text);}
+.titles span{display:block;margin-top:6px;font-size:13px;letter-spacing:0.3em;text-transform:uppercase;color:var(--muted);}
+.nav-tabs{display:flex;gap:14px;flex-wrap:wrap;padding:0 6px;}
+.nav-tabs a{flex:1 1 150px;text-align:center;padding:14px 18px;border-radius:18px;background:rgba(13,20,46,0.85);border:1px solid rgba(110,126,255,0.15);color:#b8c0ff;text-decoration:none;font-weight:600;text-transform:uppercase;letter-spacing:0.08em;transition:all 0.2s ease;}
+.nav-tabs a.active,.nav-tabs a:hover{background:linear-gradient(135deg,var(--accent),var(--accent-2));color:#f8faff;box-shadow:0 18px 36px rgba(96,96,255,0.4);}
+.nav-tabs .logout{flex:0 0 auto;padding:14px 26px;}
+main{display:flex;flex-direction:column;gap:30px;}
+.toast{padding:16px 20px;border-radius:18px;background:linear-gradient(135deg,rgba(98,109,255,0.35),rgba(128,91,255,0.25));border:1px solid rgba(120,134,255,0.45);box-shadow:0 22px 48px rgba(83,94,255,0.35);font-weight:600;}
+.toast.error{background:rgba(239,68,68,0.18);border-color:rgba(248,113,113,0.4);color:#fecaca;}
+.hero{padding:36px;border-radius:26px;background:linear-gradient(140deg,rgba(20,28,62,0.96),rgba(10,16,40,0.92));border:1px solid var(--border);box-shadow:var(--shadow);display:flex;flex-direction:column;gap:28px;}
+.hero-head{display:flex;flex-direction:column;gap:8px;}
+.hero-head h2{margin:0;font-family:'Oxanium',cursive;font-size:32px;letter-spacing:0.14em;text-transform:uppercase;}
+.hero-head span{font-size:12px;letter-spacing:0.36em;text-transform:uppercase;color:var(--muted);}
+.stats-grid{display:grid;gap:20px;grid-template-columns:repeat(auto-fit,minmax(200px,1fr));}
+.stat-card{padding:22px;border-radius:20px;background:linear-gradient(145deg,rgba(18,25,56,0.95),rgba(9,14,34,0.95));border:1px solid rgba(110,126,255,0.2);box-shadow:0 20px 52px rgba(8,12,34,0.55);display:flex;flex-direction:column;gap:10px;}
+.stat-title{font-size:13px;letter-spacing:0.18em;text-transform:uppercase;color:var(--muted);}
+.stat-value{font-family:'Oxanium',cursive;font-size:36px;letter-spacing:0.12em;color:#ffffff;}
+.stat-foot{font-size:12px;color:var(--accent-3);letter-spacing:0.18em;text-transform:uppercase;}
+.panel-grid{display:grid;gap:26px;grid-template-columns:repeat(auto-fit,minmax(320px,1fr));}
+.panel-grid.single-column{grid-template-columns:1fr;}
+.panel{padding:28px;border-radius:var(--radius);background:linear-gradient(135deg,rgba(17,24,55,0.95),rgba(11,16,40,0.92));border:1px solid var(--border);box-shadow:var(--shadow);display:flex;flex-direction:column;gap:20px;}
+.panel.wide{grid-column:1/-1;}
+.panel-head{display:flex;align-items:flex-start;justify-content:space-between;gap:18px;}
+.panel-head h3{margin:0;font-family:'Oxanium',cursive;text-transform:uppercase;letter-spacing:0.16em;font-size:18px;}
+.panel-head p{margin:6px 0 0;font-size:13px;color:var(--muted);}
+.filter-bar{display:flex;gap:12px;flex-wrap:wrap;padding:10px;border-radius:16px;background:rgba(16,23,52,0.6);border:1px solid rgba(110,126,255,0.2);}
+.filter-bar input,.filter-bar select{flex:1 1 200px;padding:12px 14px;border-radius:14px;border:1px solid rgba(120,136,255,0.3);background:rgba(6,10,28,0.8);color:var(--text);}
+.filter-bar button{margin:0;padding:12px 22px;border-radius:16px;background:linear-gradient(135deg,var(--accent),var(--accent-2));color:#fff;font-weight:600;text-transform:uppercase;letter-spacing:0.12em;border:none;cursor:pointer;box-shadow:0 16px 36px rgba(95,91,255,0.4);}
+.config-grid{display:grid;grid-template-columns:repeat(auto-fit,minmax(260px,1fr));gap:18px;}
+.config-card{padding:18px;border-radius:18px;background:rgba(12,18,44,0.92);border:1px solid rgba(108,124,255,0.18);box-shadow:0 20px 46px rgba(6,10,30,0.5);display:flex;flex-direction:column;gap:12px;}
+.config-key{font-family:'Oxanium',cursive;font-size:12px;letter-spacing:0.18em;text-transform:uppercase;color:#aeb8ff;}
+.config-value{font-size:15px;font-weight:600;color:#f5f7ff;word-break:break-word;}
+.config-meta{font-size:11px;color:var(--muted);letter-spacing:0.08em;text-transform:uppercase;}
+.config-desc{font-size:12px;color:#9ca7ff;line-height:1.4;}
+.config-inline{display:flex;flex-direction:column;gap:10px;}
+.config-inline input,.config-inline textarea,.config-inline select{padding:10px 12px;border-radius:12px;border:1px solid rgba(110,126,255,0.26);background:rgba(7,12,30,0.85);color:#f8faff;}
+.config-inline button{margin:0;align-self:flex-start;}
+.config-form{display:flex;flex-direction:column;gap:12px;}
+.config-form input,.config-form textarea,.config-form select{padding:12px 14px;border-radius:14px;border:1px solid rgba(120,136,255,0.3);background:rgba(6,10,28,0.82);color:#f8faff;}
+textarea{min-height:140px;resize:vertical;}
+button{margin-top:16px;padding:12px 22px;border:none;border-radius:18px;background:linear-gradient(135deg,var(--accent),var(--accent-2));color:#fff;font-weight:700;text-transform:uppercase;letter-spacing:0.14em;cursor:pointer;box-shadow:0 20px 44px rgba(90,96,255,0.45);transition:transform 0.2s ease,box-shadow 0.2s ease;}
+button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.6);}
+.list-table{width:100%;border-collapse:collapse;border-radius:18px;overflow:hidden;}
+.list-table th{font-size:12px;letter-spacing:0.12em;text-transform:uppercase;text-align:left;padding:12px 14px;color:#a3abff;background:rgba(16,23,52,0.65);border-bottom:1px solid rgba(104,120,255,0.2);}
+.list-table td{padding:14px;border-bottom:1px solid rgba(60,74,120,0.4);}
+.list-table tr:hover{background:rgba(17,26,58,0.6);}
+.list-table.compact td{padding:12px 10px;}
+.muted{font-size:12px;color:var(--muted);}
+.status-pill{display:inline-block;padding:4px 10px;border-radius:999px;font-size:11px;text-transform:uppercase;letter-spacing:0.08em;font-weight:600;background:rgba(96,122,255,0.2);color:#cbd4ff;}
+.role-pill{display:inline-block;padding:4px 10px;border-radius:12px;font-size:11px;background:rgba(95,91,255,0.18);color:#cbd5ff;margin:2px 4px 2px 0;}
+.role-pill.meta{margin-left:auto;background:rgba(95,91,255,0.3);color:#fff;}
+.role-chip{display:inline-block;padding:4px 10px;border-radius:12px;font-size:11px;background:rgba(95,91,255,0.18);color:#cbd5ff;margin:2px 4px 2px 0;}
+.pill-button{display:inline-flex;align-items:center;justify-content:center;padding:8px 16px;border-radius:999px;background:linear-gradient(135deg,var(--accent),var(--accent-2));color:#fff;text-decoration:none;font-size:12px;letter-spacing:0.12em;text-transform:uppercase;font-weight:600;box-shadow:0 18px 36px rgba(95,91,255,0.4);}
+.nitro-pill{display:inline-block;padding:4px 8px;border-radius:10px;background:rgba(255,155,0,0.28);color:#ffdca8;font-size:11px;margin-left:6px;letter-spacing:0.05em;}
+.manage-panel{gap:18px;}
+.manage-meta{display:flex;flex-wrap:wrap;gap:12px;font-size:12px;color:var(--muted);}
+.manage-grid{display:grid;gap:18px;grid-template-columns:repeat(auto-fit,minmax(260px,1fr));}
+.manage-card{padding:18px;border-radius:16px;background:rgba(15,22,50,0.85);border:1px solid rgba(108,124,255,0.2);display:flex;flex-direction:column;gap:14px;}
+.stack-form{display:flex;flex-direction:column;gap:12px;}
+.stack-form input,.stack-form select{padding:10px 12px;border-radius:12px;border:1px solid rgba(108,124,255,0.26);background:rgba(8,12,32,0.85);color:#f8faff;}
+.stack-form button{margin:0;}
+.action-row{display:flex;gap:10px;flex-wrap:wrap;}
+.action-row input{flex:1 1 160px;}
+.checkbox-grid{display:grid;grid-template-columns:repeat(auto-fit,minmax(140px,1fr));gap:10px;}
+.checkbox-tile{display:flex;align-items:center;gap:8px;padding:8px 10px;border-radius:12px;background:rgba(12,18,44,0.8);border:1px solid rgba(108,124,255,0.2);font-size:12px;color:#d5dcff;}
+.checkbox-tile input{margin:0;}
+.role-card{border-radius:18px;border:1px solid rgba(110,126,255,0.18);background:rgba(12,18,44,0.7);margin-bottom:12px;overflow:hidden;}
+.role-card summary{cursor:pointer;display:flex;align-items:center;gap:12px;padding:16px 18px;font-weight:600;letter-spacing:0.06em;color:#dde4ff;}
+.role-card[open] summary{background:rgba(17,26,58,0.85);}
+.color-dot{width:14px;height:14px;border-radius:50%;box-shadow:0 0 12px rgba(255,255,255,0.2);}
+.role-body{padding:16px 20px;background:rgba(10,16,40,0.92);}
+.member-list{list-style:none;margin:0;padding:0;display:grid;gap:10px;grid-template-columns:repeat(auto-fit,minmax(220px,1fr));}
+.member-list li{padding:12px;border-radius:12px;background:rgba(16,23,52,0.6);display:flex;flex-direction:column;gap:4px;}
+.music-panel{position:relative;padding:32px;border-radius:26px;background:linear-gradient(135deg,#6235ff,#a14cff);box-shadow:0 26px 64px rgba(98,53,255,0.45);color:#fff;overflow:hidden;}
+.music-panel:after{content:'';position:absolute;inset:0;background:linear-gradient(120deg,rgba(255,255,255,0.08),rgba(255,255,255,0));pointer-events:none;}
+.music-header{display:flex;justify-content:space-between;font-size:13px;letter-spacing:0.24em;text-transform:uppercase;color:rgba(255,255,255,0.68);}
+.music-title{font-family:'Oxanium',cursive;font-size:28px;margin:14px 0 6px;letter-spacing:0.12em;}
+.music-title a{color:#fff;text-decoration:none;}
+.music-sub{font-size:13px;letter-spacing:0.06em;color:rgba(255,255,255,0.75);}
+.music-progress{display:flex;align-items:center;gap:12px;margin:22px 0 16px;font-size:12px;letter-spacing:0.1em;}
+.progress-track{flex:1;height:6px;border-radius:999px;background:rgba(255,255,255,0.2);overflow:hidden;}
+.progress-fill{width:42%;height:100%;background:rgba(255,255,255,0.65);}
+.music-controls{display:flex;gap:12px;flex-wrap:wrap;}
+.music-controls button{margin:0;padding:12px 18px;border-radius:14px;border:none;background:rgba(6,10,28,0.35);color:#fff;font-size:18px;cursor:pointer;transition:transform 0.2s ease,background 0.2s ease;}
+.music-controls button:hover{transform:translateY(-2px);background:rgba(6,10,28,0.55);}
+.empty-state{padding:22px;border-radius:16px;background:rgba(15,22,52,0.6);border:1px dashed rgba(110,126,255,0.35);text-align:center;color:#a6b0ff;}
+.tab-actions{display:flex;gap:12px;flex-wrap:wrap;}
+.tab-actions button{margin:0;}
+.tab-actions form{margin:0;}
+.checkbox-row{display:flex;align-items:center;gap:10px;font-size:12px;color:#d0d7ff;}
+.checkbox-row input{width:auto;margin:0;}
+@media(max-width:820px){.dashboard{padding:32px 18px 80px;}.topbar{flex-direction:column;align-items:flex-start;gap:18px;}.nav-tabs a{flex:1 1 45%;}.music-panel{padding:26px;}.music-title{font-size:24px;}.panel-grid{grid-template-columns:1fr;}}
+</style>
+""".strip()
+
+_LAYOUT_PREFIX = (
+    "<!DOCTYPE html>"
+    "<html><head><meta charset='utf-8'><title>Primeblocks Manager</title>"
+    f"{_LAYOUT_CSS}</head><body>"
+    "<div class='dashboard'>"
+    "<header class='topbar'>"
+    "<div class='logo'><svg viewBox='0 0 24 24'><path d='M12 2l8 4v6c0 5.25-3.5 10-8 10s-8-4.75-8-10V6l8-4zm0 2.18L6 6.53v5.47c0 4.05 2.46 7.8 6 7.8s6-3.75 6-7.8V6.53l-6-2.35zm0 3.32a3.5 3.5 0 0 1 2.48 5.98L12 17.96l-2.48-4.48A3.5 3.5 0 0 1 12 7.5zm0 2a1.5 1.5 0 1 0 0 3 1.5 1.5 0 0 0 0-3z'/></svg></div>"
+    "<div class='titles'><h1>Discord Dashboard</h1><span>"
+).encode()
+_LAYOUT_AFTER_SUBTITLE = b"</span></div></header>"
+_LAYOUT_SUFFIX = b"</main></div></body></html>"
+# Status 200 ist beim Streamen schon gesendet: Renderfehler landen als Hinweis in der Seite
+_STREAM_ERROR_BLOCK = "<div class='toast error'>Seite konnte nicht vollständig geladen werden.</div>".encode()
+
+
+def _render_nav(active: str) -> bytes:
+    links = "".join(
+        f"<a class='{'active' if slug == active else ''}' href='{href}'>{html.escape(label)}</a>"
+        for slug, label, href in _NAV_TABS
+    )
+    return f"<nav class='nav-tabs'>{links}<a class='logout' href='/logout'>Logout</a></nav>".encode()
+
+
+_NAV_VARIANTS: Dict[str, bytes] = {slug: _render_nav(slug) for slug, _label, _href in _NAV_TABS}
+_NAV_DEFAULT = _render_nav("")
+
+
+def _render_status_badge(label: str, background: str) -> str:
+    return (
+        "<span class='status-pill' style='background:" + background + ";color:#e2e8f0;'>"
+        f"{html.escape(label)}"
+        "</span>"
+    )
+
+
+_STATUS_BADGE_FALLBACK_BG = "rgba(148,163,184,0.35)"
+_STATUS_PALETTE = {
+    discord.Status.online: "rgba(74,222,128,0.25)",
+    discord.Status.idle: "rgba(250,204,21,0.25)",
+    discord.Status.dnd: "rgba(248,113,113,0.3)",
+    discord.Status.offline: "rgba(100,116,139,0.25)",
+    discord.Status.invisible: "rgba(100,116,139,0.25)",
+}
+# Fertig gerenderte Badges je Status, die Memberliste braucht pro Zeile nur einen Lookup
+_STATUS_BADGES: Dict[discord.Status, str] = {
+    status: _render_status_badge(status.name.upper(), _STATUS_PALETTE.get(status, _STATUS_BADGE_FALLBACK_BG))
+    for status in discord.Status
+}
+_STATUS_BADGE_UNKNOWN = _render_status_badge("UNKNOWN", _STATUS_BADGE_FALLBACK_BG)
+
+
+def _format_sequence(value: Iterable[object]) -> str:
+    return ", ".join(html.escape(str(item)) for item in value) or "—"
+
+
+def _format_plain(value: object) -> str:
+    return html.escape(str(value))
+
+
+# Formatierer je exaktem Typ der Konfigurationswerte
+_FORMAT_DISPATCH: Dict[type, Callable[[Any], str]] = {
+    bool: lambda value: "Ja" if value else "Nein",
+    type(None): lambda _value: "—",
+    list: _format_sequence,
+    tuple: _format_sequence,
+    set: _format_sequence,
+    str: _format_plain,
+    int: _format_plain,
+    float: _format_plain,
+}
+
+
 class ManagementServer:
+    # Gültigkeit einer Session in Sekunden, entspricht dem max_age des Cookies
+    SESSION_TTL = 86400
+
     def __init__(
         self,
         bot: commands.Bot,
@@ -45,10 +275,19 @@ class ManagementServer:
         self.host = host
         self.port = port
         self.sessions: Dict[str, str] = {}
+        # Min-Heap (Ablaufzeit, Token); abgelaufene Sessions fliegen beim nächsten Request raus
+        self._session_expiry: List[Tuple[float, str]] = []
         self._runner: Optional[web.AppRunner] = None
         self._site: Optional[web.BaseSite] = None
-        self._session_lock = asyncio.Lock()
-        self.app = web.Application(middlewares=[self._metrics_middleware])
+        # (mtime_ns des cogs-Ordners, Extensions) - neu gescannt nur nach Änderungen im Ordner
+        self._ext_cache: Optional[Tuple[int, Tuple[str, ...]]] = None
+        # Der HealthMonitor entsteht im Bot-Konstruktor und bleibt für die Laufzeit gleich
+        self._monitor = getattr(bot, "health_monitor", None)
+        # (Konfigurationsversion, aufgelöste Guild) - verworfen bei on_ready und Guild-Join/-Remove
+        self._guild_cache: Optional[Tuple[int, discord.Guild]] = None
+        # Sortierte (Schlüssel, Schlüssel klein, Beschreibung, Beschreibung klein), siehe _config_card_index
+        self._config_index: Optional[Tuple[Tuple[str, str, str, str], ...]] = None
+        self.app = web.Application(middlewares=[self._metrics_middleware, self._auth_middleware])
         self._register_routes()
 
     # ------------------------------------------------------------------
@@ -77,21 +316,37 @@ class ManagementServer:
 
     @web.middleware
     async def _metrics_middleware(self, request: web.Request, handler):
-        start = time.perf_counter()
+        monitor = self._monitor
+        path = request.rel_url.path
+        # /health nicht mitzählen, sonst misst das Monitoring vor allem sich selbst
+        if monitor is None or path == "/health":
+            return await handler(request)
+        start = time.perf_counter_ns()
         try:
             response = await handler(request)
         except Exception:
-            duration = (time.perf_counter() - start) * 1000.0
-            monitor = getattr(self.bot, "health_monitor", None)
-            if monitor:
-                monitor.record_http_request(request.method, request.rel_url.path, duration, 500)
+            self._schedule_metric(monitor, request.method, path, start, 500)
             raise
-        else:
-            duration = (time.perf_counter() - start) * 1000.0
-            monitor = getattr(self.bot, "health_monitor", None)
-            if monitor:
-                monitor.record_http_request(request.method, request.rel_url.path, duration, getattr(response, "status", 200))
-            return response
+        self._schedule_metric(monitor, request.method, path, start, getattr(response, "status", 200))
+        return response
+
+    @staticmethod
+    def _schedule_metric(monitor, method: str, path: str, start: int, status: int) -> None:
+        # Ganzzahlige Nanosekunden, nur für die Millisekunden einmal dividieren
+        duration = (time.perf_counter_ns() - start) / 1_000_000
+        # Erst im nächsten Loop-Durchlauf verbuchen, die Antwort geht vorher raus
+        asyncio.get_running_loop().call_soon(monitor.record_http_request, method, path, duration, status)
+
+    @web.middleware
+    async def _auth_middleware(self, request: web.Request, handler):
+        if request.path in PUBLIC_PATHS:
+            return await handler(request)
+        self._evict_expired_sessions()
+        user = self.sessions.get(request.cookies.get(COOKIE_NAME, ""))
+        if user is None:
+            raise web.HTTPFound(location="/login")
+        request["user"] = user
+        return await handler(request)
 
     async def start(self) -> None:
         if self._runner is not None:
@@ -100,9 +355,17 @@ class ManagementServer:
         await self._runner.setup()
         self._site = web.TCPSite(self._runner, host=self.host, port=self.port)
         await self._site.start()
-        print(f"Management-Webinterface aktiv: http://{self.host}:{self.port}")
+        add_listener = getattr(self.bot, "add_listener", None)
+        if add_listener is not None:
+            for event in _GUILD_CACHE_EVENTS:
+                add_listener(self._drop_guild_cache, event)
+        log.info("Management-Webinterface aktiv: http://%s:%s", self.host, self.port)
 
     async def stop(self) -> None:
+        remove_listener = getattr(self.bot, "remove_listener", None)
+        if remove_listener is not None:
+            for event in _GUILD_CACHE_EVENTS:
+                remove_listener(self._drop_guild_cache, event)
         if self._site is not None:
             await self._site.stop()
             self._site = None
@@ -114,20 +377,27 @@ class ManagementServer:
     # Helpers
     # ------------------------------------------------------------------
     def _is_authenticated(self, request: web.Request) -> bool:
+        self._evict_expired_sessions()
         token = request.cookies.get(COOKIE_NAME)
         return token in self.sessions
 
-    async def _create_session(self) -> str:
+    def _evict_expired_sessions(self) -> None:
+        expiry = self._session_expiry
+        now = time.monotonic()
+        while expiry and expiry[0][0] <= now:
+            _expires_at, token = heapq.heappop(expiry)
+            self.sessions.pop(token, None)
+
+    # Einzelne Dict-Operationen ohne await dazwischen: kein Lock nötig
+    def _create_session(self) -> str:
         token = secrets.token_urlsafe(32)
-        async with self._session_lock:
-            self.sessions[token] = self.username
+        self.sessions[token] = self.username
+        heapq.heappush(self._session_expiry, (time.monotonic() + self.SESSION_TTL, token))
         return token
 
-    async def _invalidate_session(self, request: web.Request) -> None:
+    def _invalidate_session(self, request: web.Request) -> None:
         token = request.cookies.get(COOKIE_NAME)
-        if not token:
-            return
-        async with self._session_lock:
+        if token:
             self.sessions.pop(token, None)
 
     def _redirect(self, location: str, message: Optional[str] = None) -> web.HTTPFound:
@@ -138,16 +408,30 @@ class ManagementServer:
         response = web.HTTPFound(location=target)
         return response
 
-    def _require_auth(self, request: web.Request) -> None:
-        if not self._is_authenticated(request):
-            raise web.HTTPFound(location="/login")
+    @staticmethod
+    def _html_response(page: bytes, *, status: int = 200) -> web.Response:
+        # Seite liegt bereits als UTF-8-Bytes vor, kein erneutes Encoding in aiohttp
+        return web.Response(body=page, status=status, content_type="text/html", charset="utf-8")
 
     def _safe_redirect_target(self, target: Optional[str]) -> str:
         if target and isinstance(target, str) and target.startswith("/"):
             return target
         return "/"
 
+    async def _drop_guild_cache(self, *_args: object) -> None:
+        self._guild_cache = None
+
     def _primary_guild(self) -> Optional[discord.Guild]:
+        version = self.config.version
+        cached = self._guild_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        guild = self._resolve_primary_guild()
+        # "Keine Guild" nicht cachen: beim Start kommen die Guilds erst mit READY
+        self._guild_cache = (version, guild) if guild is not None else None
+        return guild
+
+    def _resolve_primary_guild(self) -> Optional[discord.Guild]:
         guild_id = 0
         try:
             guild_id = int(self.config.get("guild_id", 0) or 0)
@@ -165,31 +449,20 @@ class ManagementServer:
     def _format_datetime(value: Optional[datetime]) -> str:
         if not value:
             return "—"
-        if value.tzinfo is None:
-            value = value.replace(tzinfo=timezone.utc)
-        else:
+        # Naive Werte gelten als UTC; discord.py liefert ohnehin timezone.utc
+        tzinfo = value.tzinfo
+        if tzinfo is not None and tzinfo is not timezone.utc:
             value = value.astimezone(timezone.utc)
-        return value.strftime("%Y-%m-%d %H:%M UTC")
+        # Festes Format direkt zusammensetzen, ohne strftime
+        return f"{value.year:04d}-{value.month:02d}-{value.day:02d} {value.hour:02d}:{value.minute:02d} UTC"
 
-    def _status_badge(self, status: Optional[discord.Status]) -> str:
-        if status is None:
-            label = "UNKNOWN"
-            background = "rgba(148,163,184,0.35)"
-        else:
-            label = status.name.upper()
-            palette = {
-                discord.Status.online: "rgba(74,222,128,0.25)",
-                discord.Status.idle: "rgba(250,204,21,0.25)",
-                discord.Status.dnd: "rgba(248,113,113,0.3)",
-                discord.Status.offline: "rgba(100,116,139,0.25)",
-                discord.Status.invisible: "rgba(100,116,139,0.25)",
-            }
-            background = palette.get(status, "rgba(148,163,184,0.35)")
-        return (
-            "<span class='status-pill' style='background:" + background + ";color:#e2e8f0;'>"
-            f"{html.escape(label)}"
-            "</span>"
-        )
+    @staticmethod
+    def _status_badge(status: Optional[discord.Status]) -> str:
+        badge = _STATUS_BADGES.get(status, _STATUS_BADGE_UNKNOWN)
+        if badge is _STATUS_BADGE_UNKNOWN and status is not None:
+            # Von discord.py nachgereichter, unbekannter Status
+            return _render_status_badge(status.name.upper(), _STATUS_BADGE_FALLBACK_BG)
+        return badge
 
     @staticmethod
     def _coerce_form_value(value: object, default: str = "") -> str:
@@ -207,6 +480,9 @@ class ManagementServer:
         text = (value or "").strip().lower()
         if not text:
             return None
+        # Häufigster Fall: reine Sekundenangabe, ohne float()-Versuch per Exception
+        if text.isdecimal():
+            return int(text) or None
         try:
             numeric = float(text)
         except ValueError:
@@ -215,30 +491,30 @@ class ManagementServer:
             if numeric <= 0:
                 return None
             return int(numeric)
-        matches = re.findall(r"(\d+)([smhd])", text)
+        matches = _TIMESPAN_RE.findall(text)
         if not matches:
             return None
-        unit_map = {"s": 1, "m": 60, "h": 3600, "d": 86400}
-        total = 0
-        for amount_str, unit in matches:
-            amount = int(amount_str)
-            factor = unit_map.get(unit, 0)
-            total += amount * factor
+        # Das Muster lässt nur bekannte Einheiten zu
+        total = sum(int(amount) * _TIMESPAN_UNITS[unit] for amount, unit in matches)
         return total or None
 
-    def _available_extensions(self) -> List[str]:
-        base_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cogs")
-        if not os.path.isdir(base_dir):
-            return []
-        extensions: List[str] = []
-        for entry in os.listdir(base_dir):
-            if not entry.endswith(".py"):
-                continue
-            if entry.startswith("_"):
-                continue
-            module = entry[:-3]
-            extensions.append(f"cogs.{module}")
-        extensions.sort()
+    def _available_extensions(self) -> Tuple[str, ...]:
+        try:
+            mtime_ns = os.stat(COGS_DIR).st_mtime_ns
+        except OSError:
+            return ()
+        cached = self._ext_cache
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        with os.scandir(COGS_DIR) as entries:
+            extensions = tuple(
+                sorted(
+                    f"cogs.{entry.name[:-3]}"
+                    for entry in entries
+                    if entry.name.endswith(".py") and not entry.name.startswith("_") and entry.is_file()
+                )
+            )
+        self._ext_cache = (mtime_ns, extensions)
         return extensions
 
     @staticmethod
@@ -259,147 +535,54 @@ class ManagementServer:
         body: str,
         message: Optional[str] = None,
         subtitle: str = "Server Management Console",
-    ) -> str:
-        tabs = [
-            ("dashboard", "Dashboard", "/"),
-            ("members", "Members", "/members"),
-            ("announcements", "Announcements", "/announcements"),
-            ("roles", "Roles", "/roles"),
-            ("modlog", "Mod Log", "/modlog"),
-            ("music", "Music", "/music"),
-            ("cogs", "Cogs", "/cogs"),
-        ]
-        nav_links = []
-        for slug, label, href in tabs:
-            classes = "active" if slug == active else ""
-            nav_links.append(f"<a class='{classes}' href='{href}'>{html.escape(label)}</a>")
+    ) -> bytes:
+        return b"".join((self._layout_head(active, subtitle, message), body.encode(), _LAYOUT_SUFFIX))
+
+    @staticmethod
+    def _layout_head(active: str, subtitle: str, message: Optional[str]) -> bytes:
         banner = ""
         if message:
-            banner = (
-                "<div class='toast'>"
-                f"{html.escape(message)}"
-                "</div>"
+            banner = "<div class='toast'>" + html.escape(message) + "</div>"
+        return b"".join(
+            (
+                _LAYOUT_PREFIX,
+                html.escape(subtitle).encode(),
+                _LAYOUT_AFTER_SUBTITLE,
+                _NAV_VARIANTS.get(active, _NAV_DEFAULT),
+                banner.encode(),
+                b"<main>",
             )
-        css = """
-<style>@import url('https://fonts.googleapis.com/css2?family=Oxanium:wght@400;500;600;700&family=Montserrat:wght@400;600&display=swap');
-:root{--bg:#050818;--panel:#0b1229;--panel-soft:#111a3d;--accent:#615bff;--accent-2:#7f5bff;--accent-3:#56b4ff;--muted:#8790c9;--text:#eef2ff;--border:rgba(116,128,255,0.28);--shadow:0 28px 68px rgba(6,10,30,0.55);--radius:22px;}
-*{box-sizing:border-box;scrollbar-width:thin;scrollbar-color:rgba(120,140,255,0.55) transparent;}
-body{margin:0;background:radial-gradient(circle at top,#131c44 0%,#050818 52%,#050818 100%);font-family:'Montserrat',sans-serif;color:var(--text);min-height:100vh;}
-body::-webkit-scrollbar{width:8px;height:8px;}
-body::-webkit-scrollbar-thumb{background:rgba(120,140,255,0.55);border-radius:999px;}
-.dashboard{max-width:1280px;margin:0 auto;padding:42px 30px 90px;display:flex;flex-direction:column;gap:32px;}
-.topbar{display:flex;align-items:center;justify-content:space-between;padding:26px 30px;border-radius:var(--radius);background:linear-gradient(135deg,rgba(28,35,73,0.95),rgba(13,18,44,0.92));border:1px solid var(--border);box-shadow:var(--shadow);gap:26px;}
-.logo{width:58px;height:58px;border-radius:18px;background:linear-gradient(135deg,#5f5bff,#7c5bff);display:flex;align-items:center;justify-content:center;box-shadow:0 18px 36px rgba(95,91,255,0.45);}
-.logo svg{width:30px;height:30px;fill:#06081a;}
-.titles h1{margin:0;font-family:'Oxanium',cursive;font-size:28px;letter-spacing:0.1em;text-transform:uppercase;color:var(--text);}
-.titles span{display:block;margin-top:6px;font-size:13px;letter-spacing:0.3em;text-transform:uppercase;color:var(--muted);}
-.nav-tabs{display:flex;gap:14px;flex-wrap:wrap;padding:0 6px;}
-.nav-tabs a{flex:1 1 150px;text-align:center;padding:14px 18px;border-radius:18px;background:rgba(13,20,46,0.85);border:1px solid rgba(110,126,255,0.15);color:#b8c0ff;text-decoration:none;font-weight:600;text-transform:uppercase;letter-spacing:0.08em;transition:all 0.2s ease;}
-.nav-tabs a.active,.nav-tabs a:hover{background:linear-gradient(135deg,var(--accent),var(--accent-2));color:#f8faff;box-shadow:0 18px 36px rgba(96,96,255,0.4);}
-.nav-tabs .logout{flex:0 0 auto;padding:14px 26px;}
-main{display:flex;flex-direction:column;gap:30px;}
-.toast{padding:16px 20px;border-radius:18px;background:linear-gradient(135deg,rgba(98,109,255,0.35),rgba(128,91,255,0.25));border:1px solid rgba(120,134,255,0.45);box-shadow:0 22px 48px rgba(83,94,255,0.35);font-weight:600;}
-.toast.error{background:rgba(239,68,68,0.18);border-color:rgba(248,113,113,0.4);color:#fecaca;}
-.hero{padding:36px;border-radius:26px;background:linear-gradient(140deg,rgba(20,28,62,0.96),rgba(10,16,40,0.92));border:1px solid var(--border);box-shadow:var(--shadow);display:flex;flex-direction:column;gap:28px;}
-.hero-head{display:flex;flex-direction:column;gap:8px;}
-.hero-head h2{margin:0;font-family:'Oxanium',cursive;font-size:32px;letter-spacing:0.14em;text-transform:uppercase;}
-.hero-head span{font-size:12px;letter-spacing:0.36em;text-transform:uppercase;color:var(--muted);}
-.stats-grid{display:grid;gap:20px;grid-template-columns:repeat(auto-fit,minmax(200px,1fr));}
-.stat-card{padding:22px;border-radius:20px;background:linear-gradient(145deg,rgba(18,25,56,0.95),rgba(9,14,34,0.95));border:1px solid rgba(110,126,255,0.2);box-shadow:0 20px 52px rgba(8,12,34,0.55);display:flex;flex-direction:column;gap:10px;}
-.stat-title{font-size:13px;letter-spacing:0.18em;text-transform:uppercase;color:var(--muted);}
-.stat-value{font-family:'Oxanium',cursive;font-size:36px;letter-spacing:0.12em;color:#ffffff;}
-.stat-foot{font-size:12px;color:var(--accent-3);letter-spacing:0.18em;text-transform:uppercase;}
-.panel-grid{display:grid;gap:26px;grid-template-columns:repeat(auto-fit,minmax(320px,1fr));}
-.panel-grid.single-column{grid-template-columns:1fr;}
-.panel{padding:28px;border-radius:var(--radius);background:linear-gradient(135deg,rgba(17,24,55,0.95),rgba(11,16,40,0.92));border:1px solid var(--border);box-shadow:var(--shadow);display:flex;flex-direction:column;gap:20px;}
-.panel.wide{grid-column:1/-1;}
-.panel-head{display:flex;align-items:flex-start;justify-content:space-between;gap:18px;}
-.panel-head h3{margin:0;font-family:'Oxanium',cursive;text-transform:uppercase;letter-spacing:0.16em;font-size:18px;}
-.panel-head p{margin:6px 0 0;font-size:13px;color:var(--muted);}
-.filter-bar{display:flex;gap:12px;flex-wrap:wrap;padding:10px;border-radius:16px;background:rgba(16,23,52,0.6);border:1px solid rgba(110,126,255,0.2);}
-.filter-bar input,.filter-bar select{flex:1 1 200px;padding:12px 14px;border-radius:14px;border:1px solid rgba(120,136,255,0.3);background:rgba(6,10,28,0.8);color:var(--text);}
-.filter-bar button{margin:0;padding:12px 22px;border-radius:16px;background:linear-gradient(135deg,var(--accent),var(--accent-2));color:#fff;font-weight:600;text-transform:uppercase;letter-spacing:0.12em;border:none;cursor:pointer;box-shadow:0 16px 36px rgba(95,91,255,0.4);}
-.config-grid{display:grid;grid-template-columns:repeat(auto-fit,minmax(260px,1fr));gap:18px;}
-.config-card{padding:18px;border-radius:18px;background:rgba(12,18,44,0.92);border:1px solid rgba(108,124,255,0.18);box-shadow:0 20px 46px rgba(6,10,30,0.5);display:flex;flex-direction:column;gap:12px;}
-.config-key{font-family:'Oxanium',cursive;font-size:12px;letter-spacing:0.18em;text-transform:uppercase;color:#aeb8ff;}
-.config-value{font-size:15px;font-weight:600;color:#f5f7ff;word-break:break-word;}
-.config-meta{font-size:11px;color:var(--muted);letter-spacing:0.08em;text-transform:uppercase;}
-.config-desc{font-size:12px;color:#9ca7ff;line-height:1.4;}
-.config-inline{display:flex;flex-direction:column;gap:10px;}
-.config-inline input,.config-inline textarea,.config-inline select{padding:10px 12px;border-radius:12px;border:1px solid rgba(110,126,255,0.26);background:rgba(7,12,30,0.85);color:#f8faff;}
-.config-inline button{margin:0;align-self:flex-start;}
-.config-form{display:flex;flex-direction:column;gap:12px;}
-.config-form input,.config-form textarea,.config-form select{padding:12px 14px;border-radius:14px;border:1px solid rgba(120,136,255,0.3);background:rgba(6,10,28,0.82);color:#f8faff;}
-textarea{min-height:140px;resize:vertical;}
-button{margin-top:16px;padding:12px 22px;border:none;border-radius:18px;background:linear-gradient(135deg,var(--accent),var(--accent-2));color:#fff;font-weight:700;text-transform:uppercase;letter-spacing:0.14em;cursor:pointer;box-shadow:0 20px 44px rgba(90,96,255,0.45);transition:transform 0.2s ease,box-shadow 0.2s ease;}
-button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.6);}
-.list-table{width:100%;border-collapse:collapse;border-radius:18px;overflow:hidden;}
-.list-table th{font-size:12px;letter-spacing:0.12em;text-transform:uppercase;text-align:left;padding:12px 14px;color:#a3abff;background:rgba(16,23,52,0.65);border-bottom:1px solid rgba(104,120,255,0.2);}
-.list-table td{padding:14px;border-bottom:1px solid rgba(60,74,120,0.4);}
-.list-table tr:hover{background:rgba(17,26,58,0.6);}
-.list-table.compact td{padding:12px 10px;}
-.muted{font-size:12px;color:var(--muted);}
-.status-pill{display:inline-block;padding:4px 10px;border-radius:999px;font-size:11px;text-transform:uppercase;letter-spacing:0.08em;font-weight:600;background:rgba(96,122,255,0.2);color:#cbd4ff;}
-.role-pill{display:inline-block;padding:4px 10px;border-radius:12px;font-size:11px;background:rgba(95,91,255,0.18);color:#cbd5ff;margin:2px 4px 2px 0;}
-.role-pill.meta{margin-left:auto;background:rgba(95,91,255,0.3);color:#fff;}
-.role-chip{display:inline-block;padding:4px 10px;border-radius:12px;font-size:11px;background:rgba(95,91,255,0.18);color:#cbd5ff;margin:2px 4px 2px 0;}
-.pill-button{display:inline-flex;align-items:center;justify-content:center;padding:8px 16px;border-radius:999px;background:linear-gradient(135deg,var(--accent),var(--accent-2));color:#fff;text-decoration:none;font-size:12px;letter-spacing:0.12em;text-transform:uppercase;font-weight:600;box-shadow:0 18px 36px rgba(95,91,255,0.4);}
-.nitro-pill{display:inline-block;padding:4px 8px;border-radius:10px;background:rgba(255,155,0,0.28);color:#ffdca8;font-size:11px;margin-left:6px;letter-spacing:0.05em;}
-.manage-panel{gap:18px;}
-.manage-meta{display:flex;flex-wrap:wrap;gap:12px;font-size:12px;color:var(--muted);}
-.manage-grid{display:grid;gap:18px;grid-template-columns:repeat(auto-fit,minmax(260px,1fr));}
-.manage-card{padding:18px;border-radius:16px;background:rgba(15,22,50,0.85);border:1px solid rgba(108,124,255,0.2);display:flex;flex-direction:column;gap:14px;}
-.stack-form{display:flex;flex-direction:column;gap:12px;}
-.stack-form input,.stack-form select{padding:10px 12px;border-radius:12px;border:1px solid rgba(108,124,255,0.26);background:rgba(8,12,32,0.85);color:#f8faff;}
-.stack-form button{margin:0;}
-.action-row{display:flex;gap:10px;flex-wrap:wrap;}
-.action-row input{flex:1 1 160px;}
-.checkbox-grid{display:grid;grid-template-columns:repeat(auto-fit,minmax(140px,1fr));gap:10px;}
-.checkbox-tile{display:flex;align-items:center;gap:8px;padding:8px 10px;border-radius:12px;background:rgba(12,18,44,0.8);border:1px solid rgba(108,124,255,0.2);font-size:12px;color:#d5dcff;}
-.checkbox-tile input{margin:0;}
-.role-card{border-radius:18px;border:1px solid rgba(110,126,255,0.18);background:rgba(12,18,44,0.7);margin-bottom:12px;overflow:hidden;}
-.role-card summary{cursor:pointer;display:flex;align-items:center;gap:12px;padding:16px 18px;font-weight:600;letter-spacing:0.06em;color:#dde4ff;}
-.role-card[open] summary{background:rgba(17,26,58,0.85);}
-.color-dot{width:14px;height:14px;border-radius:50%;box-shadow:0 0 12px rgba(255,255,255,0.2);}
-.role-body{padding:16px 20px;background:rgba(10,16,40,0.92);}
-.member-list{list-style:none;margin:0;padding:0;display:grid;gap:10px;grid-template-columns:repeat(auto-fit,minmax(220px,1fr));}
-.member-list li{padding:12px;border-radius:12px;background:rgba(16,23,52,0.6);display:flex;flex-direction:column;gap:4px;}
-.music-panel{position:relative;padding:32px;border-radius:26px;background:linear-gradient(135deg,#6235ff,#a14cff);box-shadow:0 26px 64px rgba(98,53,255,0.45);color:#fff;overflow:hidden;}
-.music-panel:after{content:'';position:absolute;inset:0;background:linear-gradient(120deg,rgba(255,255,255,0.08),rgba(255,255,255,0));pointer-events:none;}
-.music-header{display:flex;justify-content:space-between;font-size:13px;letter-spacing:0.24em;text-transform:uppercase;color:rgba(255,255,255,0.68);}
-.music-title{font-family:'Oxanium',cursive;font-size:28px;margin:14px 0 6px;letter-spacing:0.12em;}
-.music-title a{color:#fff;text-decoration:none;}
-.music-sub{font-size:13px;letter-spacing:0.06em;color:rgba(255,255,255,0.75);}
-.music-progress{display:flex;align-items:center;gap:12px;margin:22px 0 16px;font-size:12px;letter-spacing:0.1em;}
-.progress-track{flex:1;height:6px;border-radius:999px;background:rgba(255,255,255,0.2);overflow:hidden;}
-.progress-fill{width:42%;height:100%;background:rgba(255,255,255,0.65);}
-.music-controls{display:flex;gap:12px;flex-wrap:wrap;}
-.music-controls button{margin:0;padding:12px 18px;border-radius:14px;border:none;background:rgba(6,10,28,0.35);color:#fff;font-size:18px;cursor:pointer;transition:transform 0.2s ease,background 0.2s ease;}
-.music-controls button:hover{transform:translateY(-2px);background:rgba(6,10,28,0.55);}
-.empty-state{padding:22px;border-radius:16px;background:rgba(15,22,52,0.6);border:1px dashed rgba(110,126,255,0.35);text-align:center;color:#a6b0ff;}
-.tab-actions{display:flex;gap:12px;flex-wrap:wrap;}
-.tab-actions button{margin:0;}
-.tab-actions form{margin:0;}
-.checkbox-row{display:flex;align-items:center;gap:10px;font-size:12px;color:#d0d7ff;}
-.checkbox-row input{width:auto;margin:0;}
-@media(max-width:820px){.dashboard{padding:32px 18px 80px;}.topbar{flex-direction:column;align-items:flex-start;gap:18px;}.nav-tabs a{flex:1 1 45%;}.music-panel{padding:26px;}.music-title{font-size:24px;}.panel-grid{grid-template-columns:1fr;}}
-</style>
-""".strip()
-        return (
-            "<!DOCTYPE html>"
-            "<html><head><meta charset='utf-8'><title>Primeblocks Manager</title>"
-            f"{css}</head><body>"
-            "<div class='dashboard'>"
-            "<header class='topbar'>"
-            "<div class='logo'><svg viewBox='0 0 24 24'><path d='M12 2l8 4v6c0 5.25-3.5 10-8 10s-8-4.75-8-10V6l8-4zm0 2.18L6 6.53v5.47c0 4.05 2.46 7.8 6 7.8s6-3.75 6-7.8V6.53l-6-2.35zm0 3.32a3.5 3.5 0 0 1 2.48 5.98L12 17.96l-2.48-4.48A3.5 3.5 0 0 1 12 7.5zm0 2a1.5 1.5 0 1 0 0 3 1.5 1.5 0 0 0 0-3z'/></svg></div>"
-            f"<div class='titles'><h1>Discord Dashboard</h1><span>{html.escape(subtitle)}</span></div>"
-            "</header>"
-            f"<nav class='nav-tabs'>{''.join(nav_links)}<a class='logout' href='/logout'>Logout</a></nav>"
-            + banner
-            + f"<main>{body}</main>"
-            "</div></body></html>"
         )
 
+    async def _stream_layout(
+        self,
+        request: web.Request,
+        *,
+        active: str,
+        chunks: Iterable[str],
+        message: Optional[str] = None,
+        subtitle: str = "Server Management Console",
+    ) -> web.StreamResponse:
+        """Wie _render_layout, schickt den Seitenkopf aber sofort und den Body stückweise."""
+        response = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8"})
+        await response.prepare(request)
+        await response.write(self._layout_head(active, subtitle, message))
+        iterator = iter(chunks)
+        while True:
+            # Nur Fehler beim Rendern abfangen; Schreibfehler (Client weg) laufen normal weiter
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                break
+            except Exception:
+                log.exception("Fehler beim Rendern von %s", request.path)
+                await response.write(_STREAM_ERROR_BLOCK)
+                break
+            await response.write(chunk.encode())
+        await response.write(_LAYOUT_SUFFIX)
+        await response.write_eof()
+        return response
+
     def _render_login(self, error: Optional[str] = None) -> str:
         error_block = ""
         if error:
@@ -437,14 +620,24 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
         )
 
     def _format_value(self, value: object) -> str:
-        if isinstance(value, bool):
-            return "Ja" if value else "Nein"
-        if value is None:
-            return "—"
+        formatter = _FORMAT_DISPATCH.get(type(value))
+        if formatter is not None:
+            return formatter(value)
+        # Unterklassen (z.B. eigene Listen) über den isinstance-Weg
         if isinstance(value, (list, tuple, set)):
-            joined = ", ".join(html.escape(str(item)) for item in value)
-            return joined or "—"
-        return html.escape(str(value))
+            return _format_sequence(value)
+        return _format_plain(value)
+
+    def _config_card_index(self) -> Tuple[Tuple[str, str, str, str], ...]:
+        # Das Schema ändert sich zur Laufzeit nicht, nur die Werte: einmal sortieren reicht
+        index = self._config_index
+        if index is None:
+            descriptions = self.config.schema_description
+            index = self._config_index = tuple(
+                (key, key.lower(), descriptions.get(key, ""), descriptions.get(key, "").lower())
+                for key in sorted(self.config.schema)
+            )
+        return index
 
     def _build_config_cards(
         self,
@@ -453,18 +646,17 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
         type_filter: Optional[str] = None,
         redirect: str = "/",
     ) -> str:
-        display_values = self.config.to_display_dict()
-        descriptions = self.config.schema_description
         query = (filter_text or "").strip().lower()
         type_filter_value = (type_filter or "all").strip().lower()
         cards: List[str] = []
-        schema = self.config.schema
-        for key in sorted(display_values.keys()):
-            value = display_values[key]
-            description = descriptions.get(key, "")
-            if query and query not in key.lower() and query not in description.lower():
+        get_value = self.config.get
+        schema_get = self.config.schema.get
+        redirect_escaped = html.escape(redirect)
+        for key, key_lower, description, description_lower in self._config_card_index():
+            if query and query not in key_lower and query not in description_lower:
                 continue
-            meta = schema.get(key, {})
+            value = get_value(key)
+            meta = schema_get(key, {})
             type_hint = meta.get("type")
             if callable(type_hint):
                 type_label = getattr(type_hint, "__name__", str(type_hint))
@@ -476,35 +668,38 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
             default_value = meta.get("default")
             default_display = self._format_value(default_value)
             safe_value = "" if value is None else str(value)
+            key_escaped = html.escape(key)
             cards.append(
-                "<div class='config-card'>"
-                f"<span class='config-key'>{html.escape(key)}</span>"
-                f"<div class='config-value'>{self._format_value(value)}</div>"
-                "<form class='config-inline' method='post' action='/config'>"
-                f"<input type='hidden' name='redirect' value='{html.escape(redirect)}'>"
-                f"<input type='hidden' name='key' value='{html.escape(key)}'>"
-                f"<input name='value' placeholder='Neuer Wert' value='{html.escape(safe_value)}'>"
-                "<button type='submit'>Speichern</button>"
-                "</form>"
-                f"<span class='config-meta'>Typ: {html.escape(type_label)} • Default: {default_display}</span>"
-                f"<p class='config-desc'>{html.escape(description)}</p>"
-                "</div>"
+                _CONFIG_CARD_TMPL
+                % (
+                    key_escaped,
+                    self._format_value(value),
+                    redirect_escaped,
+                    key_escaped,
+                    html.escape(safe_value),
+                    html.escape(type_label),
+                    default_display,
+                    html.escape(description),
+                )
             )
         if not cards:
             return "<p>Keine passenden Eintraege gefunden.</p>"
         return "<div class='config-grid'>" + "".join(cards) + "</div>"
 
     async def handle_index(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
         message = request.query.get("msg")
         search = request.query.get("search", "").strip()
         type_filter = request.query.get("type", "all").strip().lower()
         guild_count = len(self.bot.guilds)
-        total_members = sum(g.member_count or len(getattr(g, "members", ())) for g in self.bot.guilds)
+        monitor = self._monitor
+        if monitor is not None and monitor.guild_count:
+            # Der HealthMonitor zählt über Guild-/Member-Events mit
+            total_members = monitor.member_count
+        else:
+            total_members = sum(g.member_count or len(getattr(g, "members", ())) for g in self.bot.guilds)
         voice_connections = len(self.bot.voice_clients)
         latency_ms = int(round((self.bot.latency or 0.0) * 1000))
         command_count = len({cmd.qualified_name for cmd in self.bot.commands})
-        monitor = getattr(self.bot, "health_monitor", None)
         monitor_snapshot = None
         if monitor:
             monitor_snapshot = await monitor.snapshot()
@@ -596,10 +791,9 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
             f"{config_section}"
         )
         page = self._render_layout(active="dashboard", subtitle=subtitle, body=body, message=message)
-        return web.Response(text=page, content_type="text/html")
+        return self._html_response(page)
 
-    async def handle_members(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
+    async def handle_members(self, request: web.Request) -> web.StreamResponse:
         message = request.query.get("msg")
         search_display = request.query.get("search", "").strip()
         search_term = search_display.lower()
@@ -614,7 +808,7 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
                 "</section>"
             )
             page = self._render_layout(active="members", subtitle="Kein Server", body=body, message=message)
-            return web.Response(text=page, content_type="text/html")
+            return self._html_response(page)
 
         members = list(getattr(guild, "members", []))
         if guild.member_count is not None and guild.member_count > 0:
@@ -630,7 +824,7 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
                 "</section>"
             )
             page = self._render_layout(active="members", subtitle=subtitle, body=body, message=message)
-            return web.Response(text=page, content_type="text/html")
+            return self._html_response(page)
 
         def member_online(member: discord.Member) -> bool:
             status = getattr(member, "status", None)
@@ -694,8 +888,14 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
             selected = "selected" if value == filter_choice else ""
             filter_select.append(f"<option value='{value}' {selected}>{label}</option>")
 
-        rows: List[str] = []
-        for member in display_members:
+        manage_params = []
+        if search_display:
+            manage_params.append("search=" + quote(search_display))
+        if filter_choice not in {"", "all"}:
+            manage_params.append("filter=" + quote(filter_choice))
+        manage_link_prefix = "/members?" + "".join(param + "&" for param in manage_params) + "manage="
+
+        def render_member_row(member: discord.Member) -> str:
             status_badge = self._status_badge(getattr(member, "status", None))
             roles = [role for role in getattr(member, "roles", []) if hasattr(role, "is_default") and not role.is_default()]
             roles_html = "".join(
@@ -705,14 +905,8 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
                 roles_html = "<span class='muted'>Keine Rollen</span>"
             joined_text = self._format_datetime(getattr(member, "joined_at", None))
             nitro_badge = "<span class='nitro-pill'>Nitro</span>" if getattr(member, "premium_since", None) else "—"
-            manage_params = []
-            if search_display:
-                manage_params.append("search=" + quote(search_display))
-            if filter_choice not in {"", "all"}:
-                manage_params.append("filter=" + quote(filter_choice))
-            manage_params.append(f"manage={member.id}")
-            manage_link = "/members?" + "&".join(manage_params) + "#member-manage"
-            rows.append(
+            manage_link = f"{manage_link_prefix}{member.id}#member-manage"
+            return (
                 "<tr>"
                 f"<td><strong>{html.escape(member.display_name)}</strong><br><span class='muted'>@{html.escape(member.name)} • {member.id}</span></td>"
                 f"<td>{status_badge}</td>"
@@ -724,18 +918,24 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
                 "</tr>"
             )
 
-        if rows:
-            members_table = (
-                "<table class='list-table'>"
-                "<thead><tr><th>Member</th><th>Status</th><th>Typ</th><th>Nitro</th><th>Join</th><th>Rollen</th><th></th></tr></thead>"
-                "<tbody>" + "".join(rows) + "</tbody></table>"
+        table_chunks: Iterable[str]
+        if display_members:
+            # Jede Zeile entsteht erst beim Schreiben, siehe _stream_layout
+            table_chunks = itertools.chain(
+                (
+                    "<table class='list-table'>"
+                    "<thead><tr><th>Member</th><th>Status</th><th>Typ</th><th>Nitro</th><th>Join</th><th>Rollen</th><th></th></tr></thead>"
+                    "<tbody>",
+                ),
+                map(render_member_row, display_members),
+                ("</tbody></table>",),
             )
         else:
             if search_term or filter_choice not in {"", "all"}:
                 empty_text = "Keine passenden Mitglieder gefunden."
             else:
                 empty_text = "Mitglieder konnten nicht geladen werden."
-            members_table = f"<div class='empty-state'>{html.escape(empty_text)}</div>"
+            table_chunks = (f"<div class='empty-state'>{html.escape(empty_text)}</div>",)
 
         filter_form = (
             "<form class='filter-bar' method='get'>"
@@ -843,21 +1043,21 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
             "</section>"
         )
 
-        table_panel = (
+        table_panel_head = (
             "<div class='panel wide'>"
             "<div class='panel-head'><div><h3>Memberliste</h3><p>Bis zu 40 Eintraege, sortiert nach Aktivitaet.</p></div></div>"
             f"{filter_form}"
-            f"{members_table}"
-            "</div>"
         )
 
-        body = hero + "<section class='panel-grid single-column'>" + table_panel + (manage_panel or "") + "</section>"
+        chunks = itertools.chain(
+            (hero + "<section class='panel-grid single-column'>" + table_panel_head,),
+            table_chunks,
+            ("</div>" + (manage_panel or "") + "</section>",),
+        )
         subtitle = f"{guild.name} • Memberverwaltung"
-        page = self._render_layout(active="members", subtitle=subtitle, body=body, message=message)
-        return web.Response(text=page, content_type="text/html")
+        return await self._stream_layout(request, active="members", subtitle=subtitle, chunks=chunks, message=message)
 
     async def handle_member_action(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
         data = await request.post()
         redirect_raw = self._coerce_form_value(data.get("redirect")) or "/members"
         redirect_target = self._safe_redirect_target(redirect_raw)
@@ -959,7 +1159,6 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
         raise self._redirect(redirect_target, "Keine Aktion ausgefuehrt.")
 
     async def handle_announcements(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
         message = request.query.get("msg")
         guild = self._primary_guild()
         if guild is None:
@@ -970,7 +1169,7 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
                 "</section>"
             )
             page = self._render_layout(active="announcements", subtitle="Kein Server", body=body, message=message)
-            return web.Response(text=page, content_type="text/html")
+            return self._html_response(page)
 
         channels = [channel for channel in guild.text_channels]
         selected_channel_id: Optional[int] = None
@@ -1038,10 +1237,9 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
         body = hero + "<section class='panel-grid single-column'>" + form_panel + "</section>"
         subtitle = f"{guild.name} • Ankuendigungen"
         page = self._render_layout(active="announcements", subtitle=subtitle, body=body, message=message)
-        return web.Response(text=page, content_type="text/html")
+        return self._html_response(page)
 
     async def handle_announcement_send(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
         data = await request.post()
         redirect_raw = self._coerce_form_value(data.get("redirect")) or "/announcements"
         redirect_target = self._safe_redirect_target(redirect_raw)
@@ -1099,11 +1297,7 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
         else:
             allow_roles = False
 
-        allowed_mentions = AllowedMentions(
-            everyone=allow_everyone,
-            roles=allow_roles,
-            users=allow_users,
-        )
+        allowed_mentions = _ALLOWED_MENTIONS[allow_everyone, allow_roles, allow_users]
 
         final_content = (mention_role_text or "").strip()
         content_to_send = final_content or None
@@ -1119,8 +1313,7 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
 
         raise self._redirect(redirect_target, "Nachricht gesendet.")
 
-    async def handle_roles(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
+    async def handle_roles(self, request: web.Request) -> web.StreamResponse:
         message = request.query.get("msg")
         guild = self._primary_guild()
         if guild is None:
@@ -1131,7 +1324,7 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
                 "</section>"
             )
             page = self._render_layout(active="roles", subtitle="Kein Server", body=body, message=message)
-            return web.Response(text=page, content_type="text/html")
+            return self._html_response(page)
 
         search_display = request.query.get("search", "").strip()
         search_term = search_display.lower()
@@ -1197,8 +1390,7 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
             "</form>"
         )
 
-        role_blocks: List[str] = []
-        for role in filtered_roles:
+        def render_role(role: discord.Role) -> str:
             members_list = sorted(role.members, key=lambda m: m.display_name.lower())
             member_items = []
             for member in members_list[:40]:
@@ -1227,29 +1419,32 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
                 pills.append("<span class='role-pill meta'>Mentionable</span>")
             if role.managed:
                 pills.append("<span class='role-pill meta'>Managed</span>")
-            details_html = (
+            return (
                 "<details class='role-card'>"
                 f"<summary><span class='color-dot' style='background:{color_hex}'></span>{summary}{''.join(pills)}</summary>"
                 f"<div class='role-body'><ul class='member-list'>{''.join(member_items)}</ul></div>"
                 "</details>"
             )
-            role_blocks.append(details_html)
 
-        role_section = (
+        role_section_head = (
             "<div class='panel wide'>"
             "<div class='panel-head'><div><h3>Rollenliste</h3><p>Klappe eine Rolle auf, um Mitglieder zu sehen.</p></div></div>"
             f"{filter_form}"
-            f"{''.join(role_blocks) if role_blocks else '<div class=\'empty-state\'>Keine Rollen entsprechen dem Filter.</div>'}"
-            "</div>"
         )
 
-        body = hero + "<section class='panel-grid single-column'>" + role_section + "</section>"
+        # Rollenblöcke erst beim Schreiben rendern: eine Rolle pro Chunk statt einer großen Seite
+        role_chunks: Iterable[str] = map(render_role, filtered_roles)
+        if not filtered_roles:
+            role_chunks = ("<div class='empty-state'>Keine Rollen entsprechen dem Filter.</div>",)
+        chunks = itertools.chain(
+            (hero + "<section class='panel-grid single-column'>" + role_section_head,),
+            role_chunks,
+            ("</div></section>",),
+        )
         subtitle = f"{guild.name} • Rollen"
-        page = self._render_layout(active="roles", subtitle=subtitle, body=body, message=message)
-        return web.Response(text=page, content_type="text/html")
+        return await self._stream_layout(request, active="roles", subtitle=subtitle, chunks=chunks, message=message)
 
     async def handle_role_update(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
         data = await request.post()
         redirect_raw = self._coerce_form_value(data.get("redirect")) or "/roles"
         redirect_target = self._safe_redirect_target(redirect_raw)
@@ -1279,7 +1474,6 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
         raise self._redirect(redirect_target, f"{label} entfernt.")
 
     async def handle_modlog(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
         message = request.query.get("msg")
         guild = self._primary_guild()
         if guild is None:
@@ -1290,7 +1484,7 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
                 "</section>"
             )
             page = self._render_layout(active="modlog", subtitle="Kein Server", body=body, message=message)
-            return web.Response(text=page, content_type="text/html")
+            return self._html_response(page)
 
         entries = []
         error_box = ""
@@ -1362,10 +1556,9 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
         body = hero + error_box + "<section class='panel-grid'>" + panel + "</section>"
         subtitle = f"{guild.name} • Mod Log"
         page = self._render_layout(active="modlog", subtitle=subtitle, body=body, message=message)
-        return web.Response(text=page, content_type="text/html")
+        return self._html_response(page)
 
     async def handle_music(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
         message = request.query.get("msg")
         guild = self._primary_guild()
         if guild is None:
@@ -1376,7 +1569,7 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
                 "</section>"
             )
             page = self._render_layout(active="music", subtitle="Kein Server", body=body, message=message)
-            return web.Response(text=page, content_type="text/html")
+            return self._html_response(page)
 
         music_cog = self.bot.get_cog("Music")
         if music_cog is None or not hasattr(music_cog, "get_player"):
@@ -1387,7 +1580,7 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
                 "</section>"
             )
             page = self._render_layout(active="music", subtitle=f"{guild.name} • Music", body=body, message=message)
-            return web.Response(text=page, content_type="text/html")
+            return self._html_response(page)
 
         player = None
         queue_items = []
@@ -1528,10 +1721,9 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
         body = hero + "<section class='panel-grid single-column'>" + player_card + queue_panel + "</section>"
         subtitle = f"{guild.name} • Music"
         page = self._render_layout(active="music", subtitle=subtitle, body=body, message=message)
-        return web.Response(text=page, content_type="text/html")
+        return self._html_response(page)
 
     async def handle_music_action(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
         data = await request.post()
         redirect_raw = self._coerce_form_value(data.get("redirect")) or "/music"
         redirect_target = self._safe_redirect_target(redirect_raw)
@@ -1584,7 +1776,6 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
         raise self._redirect(redirect_target, "Unbekannte Aktion.")
 
     async def handle_cogs(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
         message = request.query.get("msg")
         guild = self._primary_guild()
         subtitle = guild.name + " • Cogs" if guild else "Cogs"
@@ -1706,10 +1897,9 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
 
         body = hero + "<section class='panel-grid'>" + table_panel + form_panel + "</section>"
         page = self._render_layout(active="cogs", subtitle=subtitle, body=body, message=message)
-        return web.Response(text=page, content_type="text/html")
+        return self._html_response(page)
 
     async def handle_cogs_action(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
         data = await request.post()
         redirect_raw = self._coerce_form_value(data.get("redirect")) or "/cogs"
         redirect_target = self._safe_redirect_target(redirect_raw)
@@ -1757,19 +1947,18 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
         password = data.get("password", "")
         if username != self.username or password != self.password:
             return web.Response(text=self._render_login("Ungültige Zugangsdaten."), content_type="text/html", status=401)
-        token = await self._create_session()
+        token = self._create_session()
         response = web.HTTPFound(location="/")
-        response.set_cookie(COOKIE_NAME, token, httponly=True, secure=False, max_age=86400)
+        response.set_cookie(COOKIE_NAME, token, httponly=True, secure=False, max_age=self.SESSION_TTL)
         raise response
 
     async def handle_logout(self, request: web.Request) -> web.Response:
-        await self._invalidate_session(request)
+        self._invalidate_session(request)
         response = web.HTTPFound(location="/login")
         response.del_cookie(COOKIE_NAME)
         raise response
 
     async def handle_config_update(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
         data = await request.post()
         key = str(data.get("key", "")).strip()
         raw_value = data.get("value", "")
@@ -1790,7 +1979,6 @@ button:hover{transform:translateY(-3px);box-shadow:0 26px 60px rgba(90,96,255,0.
         raise self._redirect(redirect_target, f"{key} aktualisiert.")
 
     async def handle_message_send(self, request: web.Request) -> web.Response:
-        self._require_auth(request)
         data = await request.post()
         channel_id_raw = str(data.get("channel_id", "")).strip()
         content = str(data.get("content", "")).strip()
@@ -1828,7 +2016,7 @@ async def maybe_start_management_server(bot: commands.Bot, config: ConfigManager
     username = os.getenv("WEB_USERNAME")
     password = os.getenv("WEB_PASSWORD")
     if not username or not password:
-        print("WEB_USERNAME/WEB_PASSWORD nicht gesetzt – Management-Webinterface deaktiviert.")
+        log.info("WEB_USERNAME/WEB_PASSWORD nicht gesetzt – Management-Webinterface deaktiviert.")
         return None
     host = os.getenv("WEB_HOST", "127.0.0.1")
     port_raw = os.getenv("WEB_PORT", "8080")